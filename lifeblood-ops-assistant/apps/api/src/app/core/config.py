@@ -1,6 +1,7 @@
 """Configuration management using Pydantic settings."""
 
 import os
+from functools import lru_cache
 from typing import Optional
 from pydantic import Field, validator
 from pydantic_settings import BaseSettings
@@ -20,26 +21,39 @@ class Settings(BaseSettings):
     # Gemini settings
     GEMINI_MODEL: str = Field(default="gemini-2.5-flash", description="Gemini model name")
     GEMINI_EMBED_MODEL: str = Field(default="gemini-embedding-001", description="Gemini embedding model name")
+    GEMINI_EMBED_BATCH: int = Field(default=100, ge=1, description="Texts sent per Gemini embedding request")
+    GEMINI_EMBED_CONCURRENCY: int = Field(default=4, ge=1, description="Gemini embedding requests in flight at once")
+    EMBED_CACHE_PATH: Optional[str] = Field(default=None, description="SQLite file for the persistent embedding cache (disabled if unset)")
+    EMBED_CACHE_INT8: bool = Field(default=False, description="Store cached embeddings as int8 with a per-vector scale")
     
-    # API Keys (sensitive - won't be printed)
-    GEMINI_API_KEY: Optional[str] = Field(default=None, description="Gemini API key")
-    GOOGLE_API_KEY: Optional[str] = Field(default=None, description="Google API key")
+    # Semantic cache for LLM responses
+    SEMCACHE_ENABLED: bool = Field(default=False, description="Reuse LLM responses for near-duplicate prompts")
+    SEMCACHE_THRESHOLD: float = Field(default=0.95, ge=0.0, le=1.0, description="Minimum prompt cosine similarity for a semantic cache hit")
+    SEMCACHE_MAX_ENTRIES: int = Field(default=1024, ge=1, description="Prompt/response pairs kept in the semantic cache")
+    ANSWER_CACHE_SIZE: int = Field(default=1024, ge=0, description="RAG answers cached by exact question, mode and top_k (0 disables)")
+    ANSWER_SEMCACHE_ENABLED: bool = Field(default=False, description="Answer near-duplicate questions from a semantic answer cache")
+    ANSWER_SEMCACHE_THRESHOLD: float = Field(default=0.95, ge=0.0, le=1.0, description="Minimum question cosine similarity for a semantic answer cache hit")
+    ANSWER_SEMCACHE_MAX_ENTRIES: int = Field(default=10000, ge=1, description="Answers kept in the semantic answer cache")
+    ANSWER_SEMCACHE_TTL_SECONDS: float = Field(default=3600.0, ge=0.0, description="Seconds a semantic cache answer stays valid (0 never expires)")
+    QUERY_EMBED_CACHE_SIZE: int = Field(default=4096, ge=0, description="Question embeddings reused by exact normalized question (0 disables)")
+    
+    # Micro-batching of concurrent /ask requests
+    ASK_BATCH_MAX: int = Field(default=32, ge=1, description="Maximum questions answered in one batch (1 answers each request asynchronously)")
+    ASK_BATCH_WAIT_MS: float = Field(default=5.0, ge=0.0, description="Milliseconds a batch waits for more questions")
+    
+    # API Keys (sensitive - excluded from model_dump() and repr())
+    GEMINI_API_KEY: Optional[str] = Field(default=None, exclude=True, repr=False, description="Gemini API key")
+    GOOGLE_API_KEY: Optional[str] = Field(default=None, exclude=True, repr=False, description="Google API key")
     
     # Vector store settings
     CHROMA_PERSIST_DIR: str = Field(default=".chroma", description="ChromaDB persistence directory")
     
+    # Ingestion settings
+    INGEST_BATCH_SIZE: int = Field(default=128, ge=1, description="Chunks embedded and written per vector store batch")
+    
     class Config:
         env_file = "../../../.env"  # Path from src/ to repo root
         case_sensitive = True
-        # Hide sensitive fields from representation
-        repr_exclude = {"GEMINI_API_KEY", "GOOGLE_API_KEY"}
-    
-    def model_dump(self, **kwargs) -> dict:
-        """Override to exclude sensitive fields from serialization."""
-        data = super().model_dump(**kwargs)
-        # Remove sensitive keys from output
-        sensitive_keys = {"GEMINI_API_KEY", "GOOGLE_API_KEY"}
-        return {k: v for k, v in data.items() if k not in sensitive_keys}
     
     def validate_gemini_api_keys(self) -> None:
         """Validate that required API keys are available for Gemini providers."""
@@ -76,8 +90,19 @@ class Settings(BaseSettings):
                 self.GOOGLE_API_KEY = primary_key
 
 
-# Global settings instance
-settings = Settings()
-
-# Set up API key compatibility bridge at startup
-settings.setup_api_key_compatibility()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the process-wide settings instance.
+    
+    The environment and .env file are parsed once on first use; later calls
+    (including FastAPI Depends(get_settings)) return the cached instance.
+    
+    Returns:
+        Cached application settings
+    """
+    settings = Settings()
+    
+    # Set up API key compatibility bridge before anything reads the keys
+    settings.setup_api_key_compatibility()
+    return settings
@@ -1,55 +1,73 @@
 """Structured logging with trace ID middleware."""
 
 import logging
-import uuid
-from typing import Callable
+import secrets
 from contextvars import ContextVar
 
-from fastapi import FastAPI, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import FastAPI
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from .config import settings
+from .config import get_settings
 
 
 # Context variable to store trace ID for the current request
 trace_id_context: ContextVar[str] = ContextVar("trace_id", default="")
 
 
-class TraceIDMiddleware(BaseHTTPMiddleware):
-    """Middleware to generate and attach trace IDs to requests and responses."""
+class TraceIDMiddleware:
+    """
+    Pure ASGI middleware to generate and attach trace IDs to requests and responses.
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    Unlike BaseHTTPMiddleware this does not wrap each request in an extra task
+    group and memory stream; it only wraps the send callable to add the header.
+    """
+    
+    # Health/liveness probe paths served without a trace ID
+    UNTRACED_PATHS = frozenset({"/healthz", "/"})
+    
+    def __init__(self, app: ASGIApp):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: The downstream ASGI application
+        """
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Generate trace ID and attach to request context and response headers."""
-        # Generate a new trace ID for this request
-        trace_id = str(uuid.uuid4())
+        if scope["type"] != "http" or scope["path"] in self.UNTRACED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        
+        # Generate a new trace ID for this request (32 hex chars, same entropy as a UUID4)
+        trace_id = secrets.token_hex(16)
         
         # Set trace ID in context for logging
         trace_id_context.set(trace_id)
         
-        # Add trace ID to request state for access in route handlers
-        request.state.trace_id = trace_id
+        async def send_with_trace_id(message: Message) -> None:
+            # Add trace ID to response headers
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Trace-Id", trace_id)
+            await send(message)
         
         # Process the request
-        response = await call_next(request)
-        
-        # Add trace ID to response headers
-        response.headers["X-Trace-Id"] = trace_id
-        
-        return response
+        await self.app(scope, receive, send_with_trace_id)
 
 
 class TraceIDFormatter(logging.Formatter):
     """Custom formatter that includes trace ID in log messages."""
     
+    # Shown for records logged outside a request (startup, background work)
+    default_trace_id = "no-trace"
+    
     def format(self, record: logging.LogRecord) -> str:
         """Format log record with trace ID if available."""
-        # Get trace ID from context
-        trace_id = trace_id_context.get("")
-        
-        # Add trace_id to the record
-        record.trace_id = trace_id if trace_id else "no-trace"
-        
-        return super().format(record)
+        record.trace_id = trace_id_context.get() or self.default_trace_id
+        return logging.Formatter.format(self, record)
 
 
 def setup_logging() -> None:
@@ -62,11 +80,10 @@ def setup_logging() -> None:
     
     # Configure root logger
     logger = logging.getLogger()
-    logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
+    logger.setLevel(getattr(logging, get_settings().LOG_LEVEL.upper(), logging.INFO))
     
     # Remove any existing handlers
-    for handler in logger.handlers[:]:
-        logger.removeHandler(handler)
+    logger.handlers.clear()
     
     # Create console handler
     console_handler = logging.StreamHandler()
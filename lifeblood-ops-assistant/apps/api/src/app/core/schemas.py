@@ -1,7 +1,7 @@
 """Pydantic models for API request/response schemas."""
 
 from typing import List, Literal, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class AskRequest(BaseModel):
@@ -23,6 +23,8 @@ class AskRequest(BaseModel):
 class Citation(BaseModel):
     """Citation information for sources."""
     
+    model_config = ConfigDict(frozen=True)
+    
     doc_id: str = Field(..., description="Document identifier")
     title: Optional[str] = Field(None, description="Document title")
     chunk_id: Optional[str] = Field(None, description="Chunk identifier within the document")
@@ -33,6 +35,8 @@ class Citation(BaseModel):
 class AskResponse(BaseModel):
     """Response schema for question answers."""
     
+    model_config = ConfigDict(frozen=True)
+    
     question: str = Field(..., description="The original question that was asked")
     answer: str = Field(..., description="The generated answer to the question")
     citations: List[Citation] = Field(
@@ -2,13 +2,19 @@
 
 import logging
 from contextlib import asynccontextmanager
+from typing import Dict
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from .core.config import settings
-from .core.logging import setup_logging, setup_middleware
+from .core.config import get_settings
+from .core.logging import get_trace_id, setup_logging, setup_middleware
 from .routes import ask, ingest
+from .routes.ingest import shutdown_chunking_pool
+from .services.ask_batcher import AskBatcher
+from .services.providers import get_rag_pipeline
 
 # Set up logging
 setup_logging()
@@ -19,6 +25,7 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
+    settings = get_settings()
     logger.info("Starting lifeblood-ops-assistant API")
     logger.info(f"Environment: {settings.APP_ENV}")
     logger.info(f"Log level: {settings.LOG_LEVEL}")
@@ -33,10 +40,24 @@ async def lifespan(app: FastAPI):
         logger.error(f"Startup validation failed: {e}")
         raise e
     
+    # Build the RAG pipeline once and share it with request handlers;
+    # a misconfiguration fails startup instead of the first request
+    app.state.rag_pipeline = get_rag_pipeline(settings)
+    logger.info("LangChain components initialized")
+    
+    # Concurrent /ask requests share embedding and LLM round trips
+    app.state.ask_batcher = AskBatcher(
+        app.state.rag_pipeline,
+        max_batch_size=settings.ASK_BATCH_MAX,
+        max_wait_seconds=settings.ASK_BATCH_WAIT_MS / 1000.0
+    )
+    
     yield
     
     # Shutdown
     logger.info("Shutting down lifeblood-ops-assistant API")
+    await app.state.ask_batcher.aclose()
+    shutdown_chunking_pool()
 
 
 # Create FastAPI application
@@ -64,19 +85,36 @@ app.add_middleware(
 # Set up other middleware
 setup_middleware(app)
 
+
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
+    """
+    Return HTTP errors in the {"detail": {"message", "trace_id"}} shape the web client reads.
+    
+    Routes raise HTTPException with a plain string detail; the trace ID is
+    added here from the request context instead of at every raise site.
+    """
+    return JSONResponse(
+        {"detail": {"message": exc.detail, "trace_id": get_trace_id() or "unknown"}},
+        status_code=exc.status_code,
+        headers=exc.headers
+    )
+
+
 # Include routers
 app.include_router(ask.router, tags=["ask"])
 app.include_router(ingest.router, tags=["ingest"])
 
 
 @app.get("/healthz")
-async def health_check():
+async def health_check() -> Dict[str, str]:
     """Health check endpoint."""
     return {"status": "ok"}
 
 
 @app.get("/")
-async def root():
+async def root() -> Dict[str, str]:
     """Root endpoint with API information."""
     return {
         "message": "Lifeblood Ops Assistant API",
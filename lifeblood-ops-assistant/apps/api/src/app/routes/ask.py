@@ -1,89 +1,64 @@
 """Ask endpoint for querying the knowledge base."""
 
+import json
 import logging
+from typing import AsyncIterator
+
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
 from ..core.schemas import AskRequest, AskResponse
-from ..core.config import settings
-from ..services.rag_pipeline import RAGPipeline
-from ..services.langchain_factory import build_lc_embeddings, build_lc_vectorstore, build_lc_llm
+from ..core.logging import get_trace_id
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+# With a response model FastAPI serializes straight to JSON bytes in pydantic-core;
+# the AskResponse instance returned here is dumped without revalidation
 @router.post("/ask", response_model=AskResponse)
-async def ask_question(request: Request, ask_request: AskRequest):
+async def ask_question(request: Request, ask_request: AskRequest) -> AskResponse:
     """Ask a question to the knowledge base."""
-    # Get trace ID from request state (set by middleware)
-    trace_id = getattr(request.state, 'trace_id', 'unknown')
+    # Get trace ID from the request context (set by middleware)
+    trace_id = get_trace_id() or 'unknown'
+    
+    logger.info("Processing question: '%s' [trace_id: %s]", ask_request.question, trace_id)
     
-    logger.info(f"Processing question: '{ask_request.question}' [trace_id: {trace_id}]")
+    # Strip once and reuse for validation, the pipeline call and the response
+    question = ask_request.question.strip()
     
     try:
         # Step 1: Validate question input
-        if not ask_request.question or not ask_request.question.strip():
-            logger.warning(f"Empty question received [trace_id: {trace_id}]")
+        if not question:
+            logger.warning("Empty question received [trace_id: %s]", trace_id)
             raise HTTPException(
                 status_code=400,
-                detail={
-                    "message": "Question cannot be empty or whitespace only",
-                    "trace_id": trace_id
-                }
+                detail="Question cannot be empty or whitespace only"
             )
         
-        # Step 2: Build LangChain components from config
-        logger.debug(f"Building LangChain RAG pipeline components [trace_id: {trace_id}]")
+        # Step 2: Get the shared ask batcher (built once at startup)
+        ask_batcher = request.app.state.ask_batcher
         
-        try:
-            # Build LangChain embeddings
-            logger.debug(f"Building LangChain embeddings [trace_id: {trace_id}]")
-            lc_embeddings = build_lc_embeddings(settings)
-            
-            # Build LangChain vector store
-            logger.debug(f"Building LangChain vector store [trace_id: {trace_id}]")
-            lc_vectorstore = build_lc_vectorstore(settings, lc_embeddings)
-            
-            # Build LangChain LLM
-            logger.debug(f"Building LangChain LLM [trace_id: {trace_id}]")
-            lc_llm = build_lc_llm(settings)
-            
-        except Exception as e:
-            logger.error(f"Failed to build LangChain components: {str(e)} [trace_id: {trace_id}]")
-            raise HTTPException(
-                status_code=500,
-                detail={
-                    "message": f"LangChain configuration error: {str(e)}",
-                    "trace_id": trace_id
-                }
-            )
+        # Step 3: Call RAG pipeline
+        logger.debug("Calling RAG pipeline with mode '%s' [trace_id: %s]", ask_request.mode, trace_id)
         
-        # Step 3: Initialize RAG pipeline with LangChain components
-        rag_pipeline = RAGPipeline(
-            vectorstore=lc_vectorstore,
-            embeddings=lc_embeddings,
-            llm=lc_llm
-        )
-        
-        # Step 4: Call RAG pipeline
-        logger.debug(f"Calling RAG pipeline with mode '{ask_request.mode}' [trace_id: {trace_id}]")
-        
-        result = rag_pipeline.ask(
-            question=ask_request.question.strip(),
-            mode=ask_request.mode,
-            top_k=ask_request.top_k
-        )
+        # Concurrent questions are batched and answered in a worker thread,
+        # keeping the blocking Chroma and Gemini calls off the event loop
+        result = await ask_batcher.ask(question, ask_request.mode, ask_request.top_k)
         
-        # Step 5: Build and return response
+        # Step 4: Build and return response
         response = AskResponse(
-            question=ask_request.question.strip(),
+            question=question,
             answer=result["answer"],
             citations=result["citations"],
             mode=ask_request.mode,
             trace_id=trace_id
         )
         
-        logger.info(f"Successfully processed question with {len(result['citations'])} citations [trace_id: {trace_id}]")
+        logger.info(
+            "Successfully processed question with %d citations [trace_id: %s]",
+            len(result['citations']), trace_id
+        )
         return response
         
     except HTTPException:
@@ -91,21 +66,46 @@ async def ask_question(request: Request, ask_request: AskRequest):
         raise
     except Exception as e:
         # Catch all other exceptions and return 500 with safe error message
-        logger.error(f"Unexpected error processing question: {e} [trace_id: {trace_id}]")
+        logger.error("Unexpected error processing question: %s [trace_id: %s]", e, trace_id)
         raise HTTPException(
             status_code=500,
-            detail={
-                "message": "An error occurred while processing your question. Please try again.",
-                "trace_id": trace_id
-            }
+            detail="An error occurred while processing your question. Please try again."
         )
 
 
-@router.get("/ask")
-async def get_ask_info():
-    """Get information about the ask endpoint."""
-    # Placeholder implementation  
-    raise HTTPException(
-        status_code=501,
-        detail="Ask info endpoint not yet implemented"
-    )
+@router.post("/ask/stream")
+async def ask_question_stream(request: Request, ask_request: AskRequest) -> StreamingResponse:
+    """
+    Ask a question and stream the answer as newline-delimited JSON.
+    
+    The first line carries the question, mode, trace ID and citations, so
+    sources can be shown before generation finishes; each following line is
+    a {"delta": text} piece of the answer.
+    """
+    trace_id = get_trace_id() or 'unknown'
+    
+    logger.info("Processing streamed question: '%s' [trace_id: %s]", ask_request.question, trace_id)
+    
+    question = ask_request.question.strip()
+    if not question:
+        logger.warning("Empty question received [trace_id: %s]", trace_id)
+        raise HTTPException(
+            status_code=400,
+            detail="Question cannot be empty or whitespace only"
+        )
+    
+    # Streamed answers bypass the ask batcher: each needs its own LLM stream
+    pipeline = request.app.state.rag_pipeline
+    
+    async def events() -> AsyncIterator[str]:
+        async for event in pipeline.ask_stream(question, ask_request.mode, ask_request.top_k):
+            if "citations" in event:
+                event = {
+                    "question": question,
+                    "mode": ask_request.mode,
+                    "trace_id": trace_id,
+                    **event
+                }
+            yield json.dumps(event) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
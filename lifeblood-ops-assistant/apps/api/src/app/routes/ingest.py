@@ -1,35 +1,153 @@
 """Ingest endpoint for adding documents to the knowledge base."""
 
+import asyncio
 import logging
-from fastapi import APIRouter, HTTPException, Request
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException
 from langchain_core.documents import Document
+from langchain_chroma import Chroma
 
 from ..core.schemas import IngestResponse
-from ..core.config import settings
-from ..utils.file_loaders import load_documents_from_directory
+from ..core.config import Settings, get_settings
+from ..core.logging import get_trace_id
+from ..utils.file_loaders import aload_documents_from_directory
 from ..utils.chunking import chunk_documents
-from ..services.langchain_factory import build_lc_embeddings, build_lc_vectorstore
+from ..services.providers import get_cached_vectorstore, get_rag_pipeline
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Chunking parameters
+_CHUNK_SIZE_CHARS = 2000
+_OVERLAP_CHARS = 200
+
+# Below this much text, process start-up and pickling cost more than chunking itself
+_PROCESS_POOL_MIN_CHARS = 1_000_000
+
+# Upper bound on chunking worker processes, independent of the host's CPU count
+_CHUNKING_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+_chunking_pool: Optional[ProcessPoolExecutor] = None
+_chunking_pool_lock = threading.Lock()
+
+
+def _get_chunking_pool() -> ProcessPoolExecutor:
+    """Get the shared chunking process pool, starting it on first use."""
+    global _chunking_pool
+    with _chunking_pool_lock:
+        if _chunking_pool is None:
+            # Spawn rather than fork: the pool starts inside a running server whose
+            # threads may hold locks (logging, document cache, SQLite) that a
+            # forked child would inherit in the locked state
+            _chunking_pool = ProcessPoolExecutor(
+                max_workers=_CHUNKING_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _chunking_pool
+
+
+def shutdown_chunking_pool() -> None:
+    """Shut down the chunking process pool if it was started."""
+    global _chunking_pool
+    with _chunking_pool_lock:
+        if _chunking_pool is not None:
+            _chunking_pool.shutdown(cancel_futures=True)
+            _chunking_pool = None
+
+
+async def _chunk_documents_off_loop(documents: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Chunk documents without blocking the event loop.
+    
+    Large corpora are split into shards and chunked across a process pool to
+    get around the GIL; small ones are chunked in a worker thread.
+    
+    Args:
+        documents: List of document dicts with 'doc_id', 'title', and 'text'
+        
+    Returns:
+        List of all chunks, in document order
+    """
+    total_chars = sum(len(doc['text']) for doc in documents)
+    if total_chars < _PROCESS_POOL_MIN_CHARS or len(documents) < 2:
+        return await anyio.to_thread.run_sync(
+            chunk_documents, documents, _CHUNK_SIZE_CHARS, _OVERLAP_CHARS
+        )
+    
+    pool = _get_chunking_pool()
+    shard_count = min(len(documents), _CHUNKING_MAX_WORKERS)
+    shard_size = -(-len(documents) // shard_count)
+    shards = [documents[i:i + shard_size] for i in range(0, len(documents), shard_size)]
+    
+    loop = asyncio.get_running_loop()
+    shard_chunks = await asyncio.gather(*[
+        loop.run_in_executor(pool, chunk_documents, shard, _CHUNK_SIZE_CHARS, _OVERLAP_CHARS)
+        for shard in shards
+    ])
+    return [chunk for chunks in shard_chunks for chunk in chunks]
+
+
+async def _add_documents_in_batches(
+    vectorstore: Chroma,
+    documents: List[Document],
+    batch_size: int,
+    embed_concurrency: int
+) -> None:
+    """
+    Add documents to the vector store in fixed-size batches.
+    
+    Each batch goes through Chroma.aadd_documents, which embeds and writes it
+    in a worker thread. Up to embed_concurrency batches run at once, so
+    embedding requests for later batches overlap the writes of earlier ones.
+    If a batch fails, its exception is raised as-is rather than wrapped in the
+    task group's ExceptionGroup.
+    
+    Args:
+        vectorstore: LangChain Chroma vector store
+        documents: Documents to add
+        batch_size: Number of documents per batch
+        embed_concurrency: Batches in flight at once
+    """
+    limiter = anyio.CapacityLimiter(embed_concurrency)
+    
+    async def add_batch(batch: List[Document]) -> None:
+        async with limiter:
+            await vectorstore.aadd_documents(batch)
+    
+    try:
+        async with anyio.create_task_group() as tg:
+            for start in range(0, len(documents), batch_size):
+                tg.start_soon(add_batch, documents[start:start + batch_size])
+    except ExceptionGroup as group:
+        # Report the failing batch's error rather than "unhandled errors in a TaskGroup"
+        error = group.exceptions[0]
+        while isinstance(error, ExceptionGroup):
+            error = error.exceptions[0]
+        raise error
+
 
 @router.post("/ingest", response_model=IngestResponse)
-async def ingest_document(request: Request):
+async def ingest_document(settings: Settings = Depends(get_settings)):
     """
     Ingest documents from data/docs into the knowledge base.
     
     Local prototype only; add auth in real environment.
     """
-    # Get trace ID from request state (set by middleware)
-    trace_id = getattr(request.state, 'trace_id', 'unknown')
+    # Get trace ID from the request context (set by middleware)
+    trace_id = get_trace_id() or 'unknown'
     
-    logger.info(f"Starting document ingestion [trace_id: {trace_id}]")
+    logger.info("Starting document ingestion [trace_id: %s]", trace_id)
     
     try:
         # Step 1: Load documents from data/docs
         logger.debug("Loading documents from data/docs directory")
-        documents = load_documents_from_directory("data/docs")
+        documents = await aload_documents_from_directory("data/docs")
         
         if not documents:
             logger.warning("No documents found in data/docs directory")
@@ -39,11 +157,11 @@ async def ingest_document(request: Request):
                 trace_id=trace_id
             )
         
-        logger.info(f"Loaded {len(documents)} documents")
+        logger.info("Loaded %d documents", len(documents))
         
         # Step 2: Chunk the documents
         logger.debug("Chunking documents")
-        chunks = chunk_documents(documents, chunk_size_chars=2000, overlap_chars=200)
+        chunks = await _chunk_documents_off_loop(documents)
         
         if not chunks:
             logger.warning("No chunks generated from documents")
@@ -53,40 +171,48 @@ async def ingest_document(request: Request):
                 trace_id=trace_id
             )
         
-        logger.info(f"Generated {len(chunks)} chunks from {len(documents)} documents")
+        logger.info("Generated %d chunks from %d documents", len(chunks), len(documents))
         
-        # Step 3: Build LangChain components
-        logger.debug("Building LangChain embeddings and vectorstore")
-        lc_embeddings = build_lc_embeddings(settings)
-        lc_vectorstore = build_lc_vectorstore(settings, lc_embeddings)
+        # Step 3: Get the shared LangChain vectorstore (built once per process)
+        logger.debug("Getting cached LangChain vectorstore")
+        lc_vectorstore = get_cached_vectorstore(settings)
         
         # Step 4: Convert chunks to LangChain Documents
         logger.debug("Converting chunks to LangChain Documents")
-        lc_documents = []
-        for chunk in chunks:
-            # Create metadata dictionary with all available chunk info
-            metadata = {
-                "doc_id": chunk.get('doc_id', 'unknown'),
-                "chunk_id": chunk.get('chunk_id', 'unknown'),
-                "title": chunk.get('title', ''),
-                "start": chunk.get('start', 0),
-                "end": chunk.get('end', 0)
-            }
-            
-            # Create LangChain Document
-            lc_doc = Document(
+        # chunk_documents always sets every field, so index directly
+        lc_documents = [
+            Document(
                 page_content=chunk['text'],
-                metadata=metadata
+                metadata={
+                    "doc_id": chunk['doc_id'],
+                    "chunk_id": chunk['chunk_id'],
+                    "title": chunk['title'],
+                    "start": chunk['start'],
+                    "end": chunk['end'],
+                    "snippet": chunk['snippet']
+                }
             )
-            lc_documents.append(lc_doc)
+            for chunk in chunks
+        ]
         
-        logger.debug(f"Converted {len(lc_documents)} chunks to LangChain Documents")
+        logger.debug("Converted %d chunks to LangChain Documents", len(lc_documents))
         
         # Step 5: Add documents to LangChain vectorstore
-        logger.debug("Adding documents to LangChain Chroma vectorstore")
-        lc_vectorstore.add_documents(lc_documents)
+        logger.debug(
+            "Adding documents to LangChain Chroma vectorstore in batches of %d",
+            settings.INGEST_BATCH_SIZE
+        )
+        await _add_documents_in_batches(
+            lc_vectorstore,
+            lc_documents,
+            settings.INGEST_BATCH_SIZE,
+            settings.GEMINI_EMBED_CONCURRENCY
+        )
+        
+        logger.info("Successfully indexed %d documents into LangChain vectorstore", len(lc_documents))
         
-        logger.info(f"Successfully indexed {len(lc_documents)} documents into LangChain vectorstore")
+        # Cached answers were built from the previous index contents
+        get_rag_pipeline(settings).clear_answer_cache()
         
         # Return success response
         return IngestResponse(
@@ -96,21 +222,8 @@ async def ingest_document(request: Request):
         )
         
     except Exception as e:
-        logger.error(f"Error during document ingestion: {e} [trace_id: {trace_id}]")
+        logger.error("Error during document ingestion: %s [trace_id: %s]", e, trace_id)
         raise HTTPException(
             status_code=500,
-            detail={
-                "message": f"Document ingestion failed: {str(e)}",
-                "trace_id": trace_id
-            }
+            detail=f"Document ingestion failed: {str(e)}"
         )
-
-
-@router.get("/ingest")
-async def get_ingest_info():
-    """Get information about the ingest endpoint."""
-    # Placeholder implementation
-    raise HTTPException(
-        status_code=501,
-        detail="Ingest info endpoint not yet implemented"
-    )
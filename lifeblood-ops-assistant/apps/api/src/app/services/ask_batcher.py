@@ -0,0 +1,125 @@
+"""Micro-batching of concurrent ask requests into RAGPipeline.ask_batch calls."""
+
+import asyncio
+import logging
+from functools import partial
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import anyio
+
+from .rag_pipeline import RAGPipeline
+
+logger = logging.getLogger(__name__)
+
+# (question, mode, top_k, future resolved with the pipeline result)
+_PendingAsk = Tuple[str, str, int, "asyncio.Future[Dict[str, Any]]"]
+
+
+class AskBatcher:
+    """
+    Collects concurrent questions and answers them together.
+    
+    The first queued question opens a batch; questions arriving within
+    max_wait_seconds (up to max_batch_size in total) join it. Each batch runs
+    in a worker thread via RAGPipeline.ask_batch, so one embeddings request and
+    one concurrent LLM batch serve the whole group. Each caller is answered as
+    soon as its own generation finishes, and new batches start while earlier
+    ones are still generating.
+    
+    With max_batch_size=1 there is nothing to group, so each question goes
+    straight to RAGPipeline.ask_async instead.
+    """
+    
+    def __init__(self, pipeline: RAGPipeline, max_batch_size: int = 32, max_wait_seconds: float = 0.005):
+        """
+        Initialize the batcher.
+        
+        Args:
+            pipeline: Pipeline used to answer batches
+            max_batch_size: Maximum questions per batch
+            max_wait_seconds: How long a batch stays open for more questions
+        """
+        self.pipeline = pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        
+        # Created on first use so they belong to the running event loop
+        self._queue: Optional["asyncio.Queue[_PendingAsk]"] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+    
+    async def ask(self, question: str, mode: str = "general", top_k: int = 5) -> Dict[str, Any]:
+        """
+        Answer a question as part of the next batch.
+        
+        Args:
+            question: User question to answer
+            mode: Response mode ("general", "checklist", "plain_english")
+            top_k: Number of top chunks to retrieve
+            
+        Returns:
+            Dictionary with 'answer' and 'citations' keys, as from RAGPipeline.ask
+        """
+        if self.max_batch_size <= 1:
+            return await self.pipeline.ask_async(question, mode, top_k)
+        
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._collect_batches())
+        
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((question, mode, top_k, future))
+        return await future
+    
+    async def _collect_batches(self) -> None:
+        """Group queued questions into batches and start each one."""
+        while True:
+            batch = [await self._queue.get()]
+            if self.max_wait_seconds > 0 and self.max_batch_size > 1:
+                await asyncio.sleep(self.max_wait_seconds)
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+    
+    async def _run_batch(self, batch: List[_PendingAsk]) -> None:
+        """Answer one batch in a worker thread and resolve its futures."""
+        requests = [(question, mode, top_k) for question, mode, top_k, _ in batch]
+        logger.debug("Running ask batch of %s", len(requests))
+        loop = asyncio.get_running_loop()
+        
+        def resolve(i: int, result: Dict[str, Any]) -> None:
+            future = batch[i][3]
+            # A caller that disconnected has already cancelled its future
+            if not future.done():
+                future.set_result(result)
+        
+        def on_result(i: int, result: Dict[str, Any]) -> None:
+            # Called from the worker thread as each answer finishes, so a short
+            # answer is returned without waiting for the rest of the batch
+            loop.call_soon_threadsafe(resolve, i, result)
+        
+        try:
+            results = await anyio.to_thread.run_sync(partial(self.pipeline.ask_batch, requests, on_result=on_result))
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for i, result in enumerate(results):
+            resolve(i, result)
+    
+    async def aclose(self) -> None:
+        """Stop collecting batches and cancel any still running."""
+        tasks = list(self._batches)
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+        self._queue = None
+        self._batches.clear()
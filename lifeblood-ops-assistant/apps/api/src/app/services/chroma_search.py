@@ -0,0 +1,69 @@
+"""Batched vector search against a LangChain Chroma vector store."""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+
+def search_by_vectors(
+    vectorstore: Chroma,
+    vectors: Sequence[Sequence[float]],
+    top_ks: Sequence[int]
+) -> List[List[Tuple[Document, float]]]:
+    """
+    Retrieve documents with relevance scores for several query vectors.
+    
+    langchain_chroma has no public batched by-vector search, and its by-vector
+    methods return raw distances rather than relevance scores. This adapter is
+    the one place that relies on Chroma internals (_collection and
+    _select_relevance_score_fn); tests/test_chroma_search.py pins its results
+    to Chroma.similarity_search_with_relevance_scores.
+    
+    A Chroma collection accepts many query vectors at once, so all of them are
+    sent in one query for the largest top_k and each row is cut to its own
+    top_k. Stores without a collection are searched per vector.
+    
+    Args:
+        vectorstore: LangChain Chroma vector store
+        vectors: Query embeddings
+        top_ks: Number of documents to return for each vector
+        
+    Returns:
+        (Document, relevance score) lists, one per vector
+    """
+    # Chroma reports distances; convert them as similarity_search_with_relevance_scores does
+    relevance_score_fn = vectorstore._select_relevance_score_fn()
+    collection = getattr(vectorstore, '_collection', None)
+    
+    if collection is None:
+        return [
+            [
+                (doc, relevance_score_fn(distance))
+                for doc, distance in vectorstore.similarity_search_by_vector_with_relevance_scores(
+                    vector, k=top_k
+                )
+            ]
+            for vector, top_k in zip(vectors, top_ks)
+        ]
+    
+    results = collection.query(
+        query_embeddings=np.asarray(vectors, dtype=np.float32),
+        n_results=max(top_ks),
+        include=['documents', 'metadatas', 'distances']
+    )
+    docs_per_vector = []
+    for row, top_k in enumerate(top_ks):
+        rows = zip(
+            results['documents'][row][:top_k],
+            results['metadatas'][row][:top_k],
+            results['ids'][row][:top_k],
+            results['distances'][row][:top_k]
+        )
+        docs_per_vector.append([
+            (Document(page_content=text, metadata=metadata or {}, id=doc_id), relevance_score_fn(distance))
+            for text, metadata, doc_id, distance in rows
+            if text is not None
+        ])
+    return docs_per_vector
@@ -2,24 +2,117 @@
 
 import hashlib
 import logging
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, MutableMapping, Optional, Tuple
+
+import numpy as np
 
 try:
-    import google.generativeai as genai
+    from google.api_core.exceptions import ResourceExhausted
 except ImportError:
-    genai = None
+    ResourceExhausted = None
 
-from ..core.config import settings
+from .genai_client import configure_genai, genai
+from ..core.config import get_settings
+from ..utils.byte_store import SQLiteByteStore
 
 logger = logging.getLogger(__name__)
 
+# Zero-vector size used when no Gemini embedding in a batch succeeded (standard embedding dimension)
+_FALLBACK_EMBED_DIM = 768
+
+# OpenSSL-backed SHA-256 from hashlib; OpenSSL selects SHA-NI/AVX2 code paths
+# at runtime, so no separate hardware-specific binding is needed
+_sha256 = hashlib.sha256
+
+# float32 value of every possible hash byte, normalized to [-1, 1] with the
+# original float64 formula so table lookups give bit-identical embeddings
+_BYTE_TO_UNIT = ((np.arange(256) / 255.0) * 2.0 - 1.0).astype(np.float32)
+
+# Rate-limit (HTTP 429) retry policy for Gemini embedding batches
+_RATE_LIMIT_RETRIES = 3
+_BACKOFF_BASE_SECONDS = 1.0
+_BACKOFF_MAX_SECONDS = 30.0
+
+# Random delay before each concurrent batch so they don't hit the API in one burst
+_SUBMIT_JITTER_SECONDS = 0.05
+
+# Bytes of the float16 scale that prefixes each int8-quantized embedding
+_INT8_SCALE_BYTES = 2
+
+
+def quantize_int8(embedding: np.ndarray) -> Tuple[float, np.ndarray]:
+    """
+    Quantize an embedding to int8 with symmetric per-vector scaling.
+    
+    Args:
+        embedding: float embedding vector
+        
+    Returns:
+        (scale, q) where embedding ~= q * scale; scale is float16-representable
+    """
+    embedding = np.asarray(embedding, dtype=np.float32)
+    max_abs = float(np.max(np.abs(embedding))) if embedding.size else 0.0
+    # Round the scale through float16 first so q is computed against the stored value
+    scale = float(np.float16(max_abs / 127.0)) or 1.0
+    q = np.clip(np.round(embedding / scale), -127, 127).astype(np.int8)
+    return scale, q
+
+
+def dequantize_int8(scale: float, q: np.ndarray) -> np.ndarray:
+    """Expand an int8-quantized embedding back to float32."""
+    return q.astype(np.float32) * np.float32(scale)
+
+
+def int8_cosine_similarity(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity between an int8 query and int8 rows, accumulated in int32.
+    
+    Per-vector scales cancel out of cosine similarity, so the quantized values
+    can be compared without dequantizing.
+    
+    Args:
+        query: int8 vector of shape (dim,)
+        matrix: int8 matrix of shape (N, dim)
+        
+    Returns:
+        float32 similarities of shape (N,)
+    """
+    query32 = query.astype(np.int32)
+    matrix32 = np.atleast_2d(matrix).astype(np.int32)
+    dots = matrix32 @ query32
+    norms = np.sqrt(np.einsum('ij,ij->i', matrix32, matrix32) * float(query32 @ query32))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        similarities = np.where(norms > 0, dots / norms, 0.0)
+    return similarities.astype(np.float32)
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an API error is a rate-limit (429) response."""
+    if ResourceExhausted is not None and isinstance(error, ResourceExhausted):
+        return True
+    return getattr(error, 'code', None) == 429
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Get the server-requested retry delay from a rate-limit error, if any."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
 
 class EmbeddingsProvider(ABC):
     """Abstract interface for text embedding providers."""
     
     @abstractmethod
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
         """
         Embed multiple texts into vectors.
         
@@ -27,12 +120,12 @@ class EmbeddingsProvider(ABC):
             texts: List of text strings to embed
             
         Returns:
-            List of embedding vectors, one for each input text
+            float32 array of shape (len(texts), dim), one row per input text
         """
         pass
     
     @abstractmethod
-    def embed_query(self, text: str) -> List[float]:
+    def embed_query(self, text: str) -> np.ndarray:
         """
         Embed a single query text into a vector.
         
@@ -40,7 +133,7 @@ class EmbeddingsProvider(ABC):
             text: Text string to embed
             
         Returns:
-            Embedding vector for the input text
+            float32 array of shape (dim,) for the input text
         """
         pass
 
@@ -61,9 +154,11 @@ class FakeEmbeddingsProvider(EmbeddingsProvider):
             embedding_dim: Dimension of embedding vectors to generate
         """
         self.embedding_dim = embedding_dim
+        # Hash byte used for each output dimension (position i uses byte i % 32)
+        self._byte_index = np.arange(embedding_dim) % hashlib.sha256().digest_size
         logger.info(f"Initialized FakeEmbeddingsProvider with dimension {embedding_dim}")
     
-    def _text_to_embedding(self, text: str) -> List[float]:
+    def _text_to_embedding(self, text: str) -> np.ndarray:
         """
         Convert text to deterministic embedding vector.
         
@@ -74,30 +169,46 @@ class FakeEmbeddingsProvider(EmbeddingsProvider):
             Deterministic embedding vector
         """
         # Create deterministic hash from text
-        text_hash = hashlib.sha256(text.encode('utf-8')).digest()
+        text_hash = np.frombuffer(_sha256(text.encode('utf-8')).digest(), dtype=np.uint8)
+        
+        # Normalize the 32 digest bytes via the lookup table, then tile them across all dimensions
+        return _BYTE_TO_UNIT[text_hash][self._byte_index]
+    
+    def _texts_to_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Convert a batch of texts to deterministic embedding vectors.
         
-        # Generate embedding values from hash
-        embedding = []
-        for i in range(self.embedding_dim):
-            # Use byte at position (i % len(hash)) to generate float
-            byte_val = text_hash[i % len(text_hash)]
-            # Normalize to [-1, 1] range
-            normalized_val = (byte_val / 255.0) * 2.0 - 1.0
-            embedding.append(normalized_val)
+        All digests are collected into one (N, 32) byte matrix so the gather
+        and normalization run once for the whole batch instead of per text.
+        Repeated texts (e.g. boilerplate chunks) are hashed only once.
         
-        return embedding
+        Args:
+            texts: Input text strings
+            
+        Returns:
+            Deterministic embedding vectors, same values as _text_to_embedding
+        """
+        # Map each distinct text to its row in the digest matrix (insertion ordered)
+        rows = {text: row for row, text in enumerate(dict.fromkeys(texts))}
+        
+        digests = b"".join(_sha256(text.encode('utf-8')).digest() for text in rows)
+        hash_matrix = np.frombuffer(digests, dtype=np.uint8).reshape(len(rows), -1)
+        
+        if len(rows) < len(texts):
+            # Expand back to one row per input text
+            hash_matrix = hash_matrix[[rows[text] for text in texts]]
+        
+        return np.take(_BYTE_TO_UNIT[hash_matrix], self._byte_index, axis=1)
     
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
         """Embed multiple texts into vectors."""
         if not texts:
-            return []
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
         
         logger.debug(f"Embedding {len(texts)} texts with FakeEmbeddingsProvider")
-        embeddings = [self._text_to_embedding(text) for text in texts]
-        
-        return embeddings
+        return self._texts_to_embeddings(texts)
     
-    def embed_query(self, text: str) -> List[float]:
+    def embed_query(self, text: str) -> np.ndarray:
         """Embed a single query text into a vector."""
         logger.debug(f"Embedding query text with FakeEmbeddingsProvider")
         return self._text_to_embedding(text)
@@ -116,6 +227,7 @@ class GeminiEmbeddingsProvider(EmbeddingsProvider):
             raise ValueError("Google GenAI library not available. Install with: pip install google-generativeai")
         
         # Use the API key from settings
+        settings = get_settings()
         api_key = settings.GEMINI_API_KEY or settings.GOOGLE_API_KEY
         if not api_key:
             raise ValueError(
@@ -124,51 +236,120 @@ class GeminiEmbeddingsProvider(EmbeddingsProvider):
         
         # Configure the client
         try:
-            genai.configure(api_key=api_key)
+            configure_genai(api_key)
             self.model_name = settings.GEMINI_EMBED_MODEL
+            self.batch_size = settings.GEMINI_EMBED_BATCH
+            self.max_in_flight = settings.GEMINI_EMBED_CONCURRENCY
             logger.info(f"Initialized GeminiEmbeddingsProvider with model {self.model_name}")
         except Exception as e:
             raise ValueError(f"Failed to configure Google GenAI: {e}")
         
         logger.info(f"Initialized GeminiEmbeddingsProvider with model {self.model_name}")
     
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    def _embed_single(self, text: str) -> Optional[List[float]]:
+        """Embed one text, returning None on failure."""
+        try:
+            # Call Gemini embedding API for single text
+            result = genai.embed_content(
+                model=self.model_name,
+                content=text
+            )
+            return result['embedding']
+            
+        except Exception as e:
+            logger.error("Error embedding text: %s", e)
+            return None
+    
+    @staticmethod
+    def _to_matrix(embeddings: List[Optional[List[float]]]) -> np.ndarray:
+        """Stack embeddings into a float32 matrix, zero-filling texts that failed to embed."""
+        dim = next((len(emb) for emb in embeddings if emb is not None), _FALLBACK_EMBED_DIM)
+        matrix = np.zeros((len(embeddings), dim), dtype=np.float32)
+        for row, embedding in enumerate(embeddings):
+            if embedding is not None:
+                matrix[row] = embedding
+        return matrix
+    
+    def _embed_batch(self, batch: List[str]) -> List[Optional[List[float]]]:
         """
-        Embed multiple texts using Gemini API.
+        Embed a batch of texts in a single Gemini API call.
+        
+        Rate-limited requests are retried with exponential backoff (honouring
+        Retry-After when the server sends it). Any other failure retries each
+        text on its own so one bad input doesn't lose the embeddings for the
+        rest of the batch.
         
         Args:
-            texts: List of text strings to embed
+            batch: Text strings to embed (at most GEMINI_EMBED_BATCH)
             
         Returns:
-            List of embedding vectors from Gemini API
+            Embedding vectors in the same order as the batch (None where a text failed)
         """
-        if not texts:
-            return []
-        
-        logger.debug(f"Embedding {len(texts)} texts with Gemini API")
-        
-        embeddings = []
-        for text in texts:
+        for attempt in range(_RATE_LIMIT_RETRIES + 1):
             try:
-                # Call Gemini embedding API for single text
+                # embed_content accepts a list and returns one vector per text
                 result = genai.embed_content(
                     model=self.model_name,
-                    content=text
+                    content=batch
                 )
-                
-                # Extract embedding values
-                embedding = result['embedding']
-                embeddings.append(embedding)
+                return result['embedding']
                 
             except Exception as e:
-                logger.error(f"Error embedding text: {e}")
-                # Use zero vector as fallback
-                embeddings.append([0.0] * 768)  # Standard embedding dimension
+                if _is_rate_limit_error(e) and attempt < _RATE_LIMIT_RETRIES:
+                    delay = _retry_after_seconds(e)
+                    if delay is None:
+                        delay = min(_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * 2 ** attempt)
+                        delay += random.uniform(0, _BACKOFF_BASE_SECONDS)
+                    logger.warning("Gemini embedding rate limited, retrying batch in %.1fs", delay)
+                    time.sleep(delay)
+                    continue
+                
+                logger.warning("Batch embedding of %s texts failed, retrying individually: %s", len(batch), e)
+                return [self._embed_single(text) for text in batch]
+    
+    def _embed_batch_with_jitter(self, batch: List[str]) -> List[Optional[List[float]]]:
+        """Embed a batch after a short random delay to spread out concurrent requests."""
+        time.sleep(random.uniform(0, _SUBMIT_JITTER_SECONDS))
+        return self._embed_batch(batch)
+    
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed multiple texts using Gemini API.
+        
+        Texts are sent in batches of GEMINI_EMBED_BATCH per request, with up to
+        GEMINI_EMBED_CONCURRENCY batches in flight at once. Texts that fail to
+        embed get a zero vector.
+        
+        Args:
+            texts: List of text strings to embed
+            
+        Returns:
+            float32 array of embedding vectors from Gemini API
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        logger.debug("Embedding %s texts with Gemini API in batches of %s", len(texts), self.batch_size)
+        
+        starts = range(0, len(texts), self.batch_size)
+        if len(starts) == 1:
+            return self._to_matrix(self._embed_batch(texts))
+        
+        # Pre-size the result so batches can complete in any order
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(starts))) as executor:
+            futures = {
+                executor.submit(self._embed_batch_with_jitter, texts[start:start + self.batch_size]): start
+                for start in starts
+            }
+            for future, start in futures.items():
+                batch_embeddings = future.result()
+                embeddings[start:start + len(batch_embeddings)] = batch_embeddings
         
         logger.debug(f"Successfully generated {len(embeddings)} embeddings")
-        return embeddings
+        return self._to_matrix(embeddings)
     
-    def embed_query(self, text: str) -> List[float]:
+    def embed_query(self, text: str) -> np.ndarray:
         """
         Embed a single query text using Gemini API.
         
@@ -176,7 +357,7 @@ class GeminiEmbeddingsProvider(EmbeddingsProvider):
             text: Text string to embed
             
         Returns:
-            Embedding vector from Gemini API
+            float32 embedding vector from Gemini API
         """
         logger.debug("Embedding query text with Gemini API")
         
@@ -188,7 +369,7 @@ class GeminiEmbeddingsProvider(EmbeddingsProvider):
             )
             
             # Extract embedding vector
-            embedding = result['embedding']
+            embedding = np.asarray(result['embedding'], dtype=np.float32)
             logger.debug("Successfully embedded query text")
             return embedding
                 
@@ -197,18 +378,157 @@ class GeminiEmbeddingsProvider(EmbeddingsProvider):
             raise
 
 
+class CachedEmbeddingsProvider(EmbeddingsProvider):
+    """
+    Content-addressed cache in front of another embeddings provider.
+    
+    Embeddings are stored as float32 bytes under
+    "<namespace>:<kind>:<sha256(text)>", so only texts that have never been
+    embedded reach the underlying provider. Use the model name as the
+    namespace so a model upgrade never serves stale vectors.
+    
+    With quantize=True vectors are stored as a float16 scale followed by int8
+    values (about a quarter of the float32 size) under separate "doc8"/"query8"
+    keys, and are dequantized to float32 on read.
+    """
+    
+    def __init__(
+        self,
+        underlying: EmbeddingsProvider,
+        store: Optional[MutableMapping[str, bytes]] = None,
+        namespace: str = "",
+        quantize: bool = False
+    ):
+        """
+        Initialize the cached provider.
+        
+        Args:
+            underlying: Provider used for cache misses
+            store: Byte store for cached vectors (in-memory dict if not given)
+            namespace: Key prefix identifying the embedding model
+            quantize: Store vectors as int8 with a per-vector scale
+        """
+        self.underlying = underlying
+        self.store = store if store is not None else {}
+        self.namespace = namespace
+        self.quantize = quantize
+    
+    def _key(self, kind: str, text: str) -> str:
+        """Build the cache key for a text."""
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        if self.quantize:
+            kind += "8"
+        return f"{self.namespace}:{kind}:{digest}"
+    
+    def _mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Read many keys, using the store's batched mget when it has one."""
+        mget = getattr(self.store, 'mget', None)
+        if mget is not None:
+            return mget(keys)
+        return [self.store.get(key) for key in keys]
+    
+    def _mset(self, items: List[Tuple[str, bytes]]) -> None:
+        """Write many keys, using the store's batched mset when it has one."""
+        mset = getattr(self.store, 'mset', None)
+        if mset is not None:
+            mset(items)
+            return
+        for key, value in items:
+            self.store[key] = value
+    
+    def _encode(self, embedding: np.ndarray) -> bytes:
+        """Serialize an embedding as float32 bytes, or scale + int8 bytes when quantizing."""
+        if self.quantize:
+            scale, q = quantize_int8(embedding)
+            return np.float16(scale).tobytes() + q.tobytes()
+        return np.asarray(embedding, dtype=np.float32).tobytes()
+    
+    def _decode(self, data: bytes) -> np.ndarray:
+        """Deserialize stored bytes back into a float32 embedding (read-only when not quantized)."""
+        if self.quantize:
+            return dequantize_int8(*self._split_int8(data))
+        return np.frombuffer(data, dtype=np.float32)
+    
+    @staticmethod
+    def _split_int8(data: bytes) -> Tuple[float, np.ndarray]:
+        """Split a quantized record into its scale and int8 values."""
+        scale = float(np.frombuffer(data, dtype=np.float16, count=1)[0])
+        return scale, np.frombuffer(data, dtype=np.int8, offset=_INT8_SCALE_BYTES)
+    
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Embed multiple texts, calling the underlying provider only for cache misses."""
+        if not texts:
+            return self.underlying.embed_texts([])
+        
+        keys = [self._key("doc", text) for text in texts]
+        cached = self._mget(keys)
+        missing = [i for i, data in enumerate(cached) if data is None]
+        
+        if missing:
+            logger.debug("Embedding cache: %s hits, %s misses", len(texts) - len(missing), len(missing))
+            new_embeddings = self.underlying.embed_texts([texts[i] for i in missing])
+            new_items = [(keys[i], self._encode(emb)) for i, emb in zip(missing, new_embeddings)]
+            self._mset(new_items)
+            for i, (_, data) in zip(missing, new_items):
+                cached[i] = data
+        
+        # Always return the decoded float32 values so hits and misses match exactly
+        return np.stack([self._decode(data) for data in cached])
+    
+    def _query_record(self, text: str) -> bytes:
+        """Return the stored bytes for a query, embedding it on a cache miss."""
+        key = self._key("query", text)
+        data = self._mget([key])[0]
+        if data is None:
+            data = self._encode(self.underlying.embed_query(text))
+            self._mset([(key, data)])
+        return data
+    
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embed a single query text, using the cache when possible."""
+        return self._decode(self._query_record(text)).copy()
+    
+    def embed_query_int8(self, text: str) -> Tuple[float, np.ndarray]:
+        """
+        Embed a query in the cache's int8 format.
+        
+        Args:
+            text: Query text to embed
+            
+        Returns:
+            (scale, q) as produced by quantize_int8
+        """
+        if not self.quantize:
+            return quantize_int8(self.embed_query(text))
+        return self._split_int8(self._query_record(text))
+
+
+@lru_cache(maxsize=1)
 def get_embeddings_provider() -> EmbeddingsProvider:
     """
     Factory function to get the configured embeddings provider.
     
+    The provider is built once and shared, since settings are fixed for the
+    lifetime of the process.
+    
     Returns:
         Configured embeddings provider based on settings
     """
-    provider_name = settings.EMBED_PROVIDER.lower()
+    provider_name = get_settings().EMBED_PROVIDER.lower()
     logger.info(f"Creating embeddings provider: {provider_name}")
     
     if provider_name == "gemini":
-        return GeminiEmbeddingsProvider()
+        provider = GeminiEmbeddingsProvider()
+        cache_path = get_settings().EMBED_CACHE_PATH
+        if cache_path:
+            logger.info("Caching Gemini embeddings in %s", cache_path)
+            return CachedEmbeddingsProvider(
+                provider,
+                store=SQLiteByteStore(cache_path),
+                namespace=provider.model_name,
+                quantize=get_settings().EMBED_CACHE_INT8
+            )
+        return provider
     elif provider_name == "fake":
         return FakeEmbeddingsProvider()
     else:
@@ -0,0 +1,28 @@
+"""Shared setup for the Google GenAI SDK used by the embeddings and LLM providers."""
+
+import logging
+from functools import lru_cache
+
+try:
+    import google.generativeai as genai
+except ImportError:
+    genai = None
+
+logger = logging.getLogger(__name__)
+
+
+# maxsize=1: the SDK holds one global configuration, so only the most recent key can be skipped
+@lru_cache(maxsize=1)
+def configure_genai(api_key: str) -> None:
+    """
+    Configure the GenAI SDK with an API key once per process.
+    
+    genai.configure replaces the SDK's global client, so calling it from every
+    provider instance rebuilds credentials and transport each time. Repeat calls
+    with the same key reuse the already configured client.
+    
+    Args:
+        api_key: Gemini / Google API key
+    """
+    logger.debug("Configuring Google GenAI SDK")
+    genai.configure(api_key=api_key)
@@ -1,8 +1,12 @@
 """LangChain component factory using existing configuration."""
 
+import importlib.util
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any
 
+import httpx
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 from langchain_chroma import Chroma
 
@@ -10,6 +14,33 @@ from ..core.config import Settings
 
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1 keep-alive
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Connection pool sizing for the Gemini HTTP clients
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=256, keepalive_expiry=30.0)
+
+
+def build_http_client_args() -> dict[str, Any]:
+    """
+    Build httpx client arguments shared by the Gemini LangChain components.
+    
+    The google-genai SDK behind the LangChain classes creates its own httpx
+    client and passes these arguments through, so synchronous calls (embed_query,
+    invoke) on each cached component reuse a tuned keep-alive pool (multiplexed
+    over HTTP/2 when h2 is installed) instead of renegotiating TLS per request.
+    
+    The same arguments are offered to the async client, but google-genai only
+    uses httpx there when aiohttp is not installed. With aiohttp, the async
+    calls (aembed_documents, ainvoke, astream) go through the SDK's own
+    per-event-loop aiohttp session, which keeps connections alive but ignores
+    these httpx-only limits and HTTP/2.
+    
+    Returns:
+        Keyword arguments for httpx.Client (and httpx.AsyncClient without aiohttp)
+    """
+    return {"limits": _HTTP_LIMITS, "http2": _HTTP2_AVAILABLE}
+
 
 def build_lc_embeddings(config: Settings) -> GoogleGenerativeAIEmbeddings:
     """
@@ -26,8 +57,6 @@ def build_lc_embeddings(config: Settings) -> GoogleGenerativeAIEmbeddings:
     if not model_name.startswith("models/"):
         model_name = f"models/{model_name}"
     
-    logger.info(f"Building LangChain embeddings with model: {model_name}")
-    
     # Use the API key from config (compatibility bridge should have set GOOGLE_API_KEY)
     api_key = config.GOOGLE_API_KEY or config.GEMINI_API_KEY
     if not api_key:
@@ -36,10 +65,21 @@ def build_lc_embeddings(config: Settings) -> GoogleGenerativeAIEmbeddings:
             "Set GOOGLE_API_KEY or GEMINI_API_KEY environment variable."
         )
     
+    return _build_lc_embeddings(model_name, api_key)
+
+
+# Cached by the primitives that configure the client (Settings itself is not
+# hashable), so every caller with the same model and key shares one instance
+@lru_cache(maxsize=4)
+def _build_lc_embeddings(model_name: str, api_key: str) -> GoogleGenerativeAIEmbeddings:
+    """Create the GoogleGenerativeAIEmbeddings client for a model and API key."""
+    logger.info("Building LangChain embeddings with model: %s", model_name)
+    
     try:
         embeddings = GoogleGenerativeAIEmbeddings(
             model=model_name,
-            google_api_key=api_key
+            google_api_key=api_key,
+            client_args=build_http_client_args()
         )
         
         logger.debug("Successfully created LangChain GoogleGenerativeAIEmbeddings")
@@ -61,7 +101,6 @@ def build_lc_llm(config: Settings) -> ChatGoogleGenerativeAI:
         Configured ChatGoogleGenerativeAI instance
     """
     model_name = config.GEMINI_MODEL
-    logger.info(f"Building LangChain LLM with model: {model_name}")
     
     # Use the API key from config (compatibility bridge should have set GOOGLE_API_KEY)
     api_key = config.GOOGLE_API_KEY or config.GEMINI_API_KEY
@@ -71,12 +110,21 @@ def build_lc_llm(config: Settings) -> ChatGoogleGenerativeAI:
             "Set GOOGLE_API_KEY or GEMINI_API_KEY environment variable."
         )
     
+    return _build_lc_llm(model_name, api_key)
+
+
+@lru_cache(maxsize=4)
+def _build_lc_llm(model_name: str, api_key: str) -> ChatGoogleGenerativeAI:
+    """Create the ChatGoogleGenerativeAI client for a model and API key."""
+    logger.info("Building LangChain LLM with model: %s", model_name)
+    
     try:
         llm = ChatGoogleGenerativeAI(
             model=model_name,
             google_api_key=api_key,
             temperature=0.1,  # Low temperature for more consistent medical responses
-            convert_system_message_to_human=True  # Handle system messages properly
+            convert_system_message_to_human=True,  # Handle system messages properly
+            client_args=build_http_client_args()
         )
         
         logger.debug("Successfully created LangChain ChatGoogleGenerativeAI")
@@ -131,14 +179,15 @@ def build_lc_components(config: Settings) -> dict[str, Any]:
     logger.info("Building complete LangChain component suite")
     
     try:
-        # Build embeddings first (needed for vectorstore)
-        embeddings = build_lc_embeddings(config)
-        
-        # Build LLM
-        llm = build_lc_llm(config)
-        
-        # Build vectorstore with embeddings
-        vectorstore = build_lc_vectorstore(config, embeddings)
+        # The LLM is independent of the other two, so build it in the background
+        # while embeddings and then the vectorstore (which needs them) are built
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="lc-build") as executor:
+            llm_future = executor.submit(build_lc_llm, config)
+            
+            embeddings = build_lc_embeddings(config)
+            vectorstore = build_lc_vectorstore(config, embeddings)
+            
+            llm = llm_future.result()
         
         components = {
             'embeddings': embeddings,
@@ -152,3 +201,9 @@ def build_lc_components(config: Settings) -> dict[str, Any]:
     except Exception as e:
         logger.error(f"Failed to build LangChain components: {e}")
         raise
+
+
+def clear_lc_client_cache() -> None:
+    """Drop the cached embeddings and LLM clients so the next build creates new ones."""
+    _build_lc_embeddings.cache_clear()
+    _build_lc_llm.cache_clear()
@@ -1,19 +1,28 @@
 """LLM client implementations for text generation."""
 
-import hashlib
 import logging
+import re
+import zlib
 from abc import ABC, abstractmethod
-from typing import List
+from functools import lru_cache
+from typing import Iterator, List, Tuple
 
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
-
-from ..core.config import settings
+from .embeddings import EmbeddingsProvider, get_embeddings_provider
+from .genai_client import configure_genai, genai
+from .semantic_cache import SemanticAnswerCache
+from ..core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Characters stripped from words before stopword filtering in MockLLMClient
+_NON_WORD_RE = re.compile(r'[^\w]')
+
+# Question and filler words skipped when extracting a topic
+_TOPIC_STOPWORDS = frozenset({
+    'what', 'how', 'why', 'when', 'where', 'who', 'is', 'are', 'the', 'a', 'an',
+    'do', 'does', 'can', 'will', 'should'
+})
+
 
 class LLMClient(ABC):
     """Abstract interface for language model clients."""
@@ -30,6 +39,22 @@ class LLMClient(ABC):
             Generated text response
         """
         pass
+    
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Generate text incrementally, yielding pieces as they become available.
+        
+        Joining the yielded pieces gives the same text as generate(). The
+        default implementation yields the full response at once; clients
+        backed by a streaming API override it.
+        
+        Args:
+            prompt: Input text prompt for generation
+            
+        Yields:
+            Successive pieces of the generated text
+        """
+        yield self.generate(prompt)
 
 
 class MockLLMClient(LLMClient):
@@ -60,7 +85,8 @@ class MockLLMClient(LLMClient):
         
         logger.info(f"Initialized MockLLMClient with {len(self.response_templates)} response templates")
     
-    def _extract_topic(self, prompt: str) -> str:
+    @staticmethod
+    def _extract_topic(prompt: str) -> str:
         """
         Extract a topic from the prompt for more realistic responses.
         
@@ -70,8 +96,6 @@ class MockLLMClient(LLMClient):
         Returns:
             Extracted topic or generic fallback
         """
-        import re
-        
         # Simple topic extraction - take first few meaningful words
         words = prompt.strip().split()[:5]
         if words:
@@ -79,8 +103,8 @@ class MockLLMClient(LLMClient):
             topic_words = []
             for word in words:
                 # Remove punctuation and convert to lowercase for filtering
-                clean_word = re.sub(r'[^\w]', '', word.lower())
-                if clean_word and clean_word not in {'what', 'how', 'why', 'when', 'where', 'who', 'is', 'are', 'the', 'a', 'an', 'do', 'does', 'can', 'will', 'should'}:
+                clean_word = _NON_WORD_RE.sub('', word.lower())
+                if clean_word and clean_word not in _TOPIC_STOPWORDS:
                     # Keep original word for output (with punctuation if needed)
                     topic_words.append(word.strip('.,!?;:'))
             
@@ -104,25 +128,54 @@ class MockLLMClient(LLMClient):
         
         logger.debug("Generating mock response for prompt")
         
-        # Use prompt hash to deterministically select a template
-        prompt_hash = hashlib.md5(prompt.encode('utf-8')).hexdigest()
-        template_index = int(prompt_hash, 16) % len(self.response_templates)
-        
-        # Extract topic for more contextual response
-        topic = self._extract_topic(prompt)
-        
-        # Generate response from template
-        template = self.response_templates[template_index]
-        response = template.format(topic=topic)
+        # Responses depend only on the prompt and templates, so they are memoized
+        return _render_mock_response(prompt, tuple(self.response_templates))
+    
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Yield the mock response in 8-character pieces to mimic token streaming.
         
-        # Add some deterministic "details" based on prompt content
-        prompt_length = len(prompt)
-        if prompt_length > 100:
-            response += " This is a detailed response given the comprehensive nature of your query."
-        elif "?" in prompt:
-            response += " I hope this answers your question effectively."
+        Args:
+            prompt: Input text prompt
+            
+        Yields:
+            Successive pieces of the deterministic mock response
+        """
+        response = self.generate(prompt)
+        for start in range(0, len(response), 8):
+            yield response[start:start + 8]
+
+
+@lru_cache(maxsize=4096)
+def _render_mock_response(prompt: str, templates: Tuple[str, ...]) -> str:
+    """
+    Build the deterministic MockLLMClient response for a prompt.
+    
+    Args:
+        prompt: Non-empty input prompt
+        templates: Response templates to choose from
         
-        return response
+    Returns:
+        Mock response text
+    """
+    # Use a prompt checksum to deterministically select a template; CRC32 is
+    # stable across processes (unlike hash()) and returns an int directly
+    template_index = zlib.crc32(prompt.encode('utf-8')) % len(templates)
+    
+    # Extract topic for more contextual response
+    topic = MockLLMClient._extract_topic(prompt)
+    
+    # Generate response from template
+    response = templates[template_index].format(topic=topic)
+    
+    # Add some deterministic "details" based on prompt content
+    prompt_length = len(prompt)
+    if prompt_length > 100:
+        response += " This is a detailed response given the comprehensive nature of your query."
+    elif "?" in prompt:
+        response += " I hope this answers your question effectively."
+    
+    return response
 
 
 class GeminiLLMClient(LLMClient):
@@ -138,6 +191,7 @@ class GeminiLLMClient(LLMClient):
             raise ValueError("Google GenAI library not available. Install with: pip install google-generativeai")
         
         # Use the API key from settings
+        settings = get_settings()
         api_key = settings.GEMINI_API_KEY or settings.GOOGLE_API_KEY
         if not api_key:
             raise ValueError(
@@ -146,8 +200,11 @@ class GeminiLLMClient(LLMClient):
         
         # Configure the client
         try:
-            genai.configure(api_key=api_key)
+            configure_genai(api_key)
             self.model_name = settings.GEMINI_MODEL
+            # One model handle for the client's lifetime; it wraps the SDK's
+            # shared service client, so connections are reused across calls
+            self.model = genai.GenerativeModel(self.model_name)
             
             logger.info(f"Initialized GeminiLLMClient with model {self.model_name}")
         except Exception as e:
@@ -169,9 +226,7 @@ class GeminiLLMClient(LLMClient):
         logger.debug("Generating text with Gemini API")
         
         try:
-            # Create GenerativeModel and generate content
-            model = genai.GenerativeModel(self.model_name)
-            response = model.generate_content(prompt)
+            response = self.model.generate_content(prompt)
             
             # Extract text from response
             if response.text:
@@ -184,21 +239,117 @@ class GeminiLLMClient(LLMClient):
         except Exception as e:
             logger.error(f"Error generating text with Gemini: {e}")
             raise
+    
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream generated text from the Gemini API as chunks arrive.
+        
+        Args:
+            prompt: Input text prompt for generation
+            
+        Yields:
+            Text of each response chunk
+        """
+        if not prompt.strip():
+            yield "Please provide a prompt for text generation."
+            return
+        
+        logger.debug("Streaming text with Gemini API")
+        
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True):
+                # chunk.text raises on chunks without content parts (e.g. the final one)
+                if chunk.parts:
+                    yield chunk.text
+        except Exception as e:
+            logger.error("Error streaming text with Gemini: %s", e)
+            raise
 
 
+class SemanticCachedLLMClient(LLMClient):
+    """
+    Semantic cache in front of another LLM client.
+    
+    Each prompt is embedded and compared against recently answered prompts;
+    if one is at least `threshold` cosine-similar, its response is returned
+    without calling the underlying client. Entries are held in a
+    SemanticAnswerCache under a single key, so the oldest are evicted first.
+    """
+    
+    # Prompts carry all their parameters, so every entry shares one cache key
+    _CACHE_KEY = "prompt"
+    
+    def __init__(
+        self,
+        llm: LLMClient,
+        embedder: EmbeddingsProvider,
+        threshold: float = 0.95,
+        max_entries: int = 1024
+    ):
+        """
+        Initialize the semantic cache.
+        
+        Args:
+            llm: Client used on cache misses
+            embedder: Provider used to embed prompts
+            threshold: Minimum cosine similarity for a cache hit
+            max_entries: Maximum number of cached prompt/response pairs
+        """
+        self.llm = llm
+        self.embedder = embedder
+        self.cache = SemanticAnswerCache(threshold=threshold, max_entries=max_entries, ttl_seconds=0)
+    
+    def generate(self, prompt: str) -> str:
+        """
+        Generate text, reusing the response to a near-duplicate prompt when possible.
+        
+        Args:
+            prompt: Input text prompt for generation
+            
+        Returns:
+            Cached or freshly generated text
+        """
+        if not prompt.strip():
+            return self.llm.generate(prompt)
+        
+        vector = self.embedder.embed_query(prompt)
+        cached = self.cache.lookup(vector, self._CACHE_KEY)
+        if cached is not None:
+            return cached
+        
+        response = self.llm.generate(prompt)
+        self.cache.store(vector, self._CACHE_KEY, response)
+        return response
+
+
+@lru_cache(maxsize=1)
 def get_llm_client() -> LLMClient:
     """
     Factory function to get the configured LLM client.
     
+    The client is built once and shared, since settings are fixed for the
+    lifetime of the process.
+    
     Returns:
         Configured LLM client based on settings
     """
+    settings = get_settings()
     provider_name = settings.LLM_PROVIDER.lower()
     logger.info(f"Creating LLM client: {provider_name}")
     
     if provider_name == "gemini":
-        return GeminiLLMClient()
+        client = GeminiLLMClient()
     elif provider_name == "mock" or provider_name == "fake":
-        return MockLLMClient()
+        client = MockLLMClient()
     else:
         raise ValueError(f"Unknown LLM provider: {provider_name}")
+    
+    if settings.SEMCACHE_ENABLED:
+        logger.info("Enabling semantic LLM cache (threshold %s)", settings.SEMCACHE_THRESHOLD)
+        return SemanticCachedLLMClient(
+            client,
+            get_embeddings_provider(),
+            threshold=settings.SEMCACHE_THRESHOLD,
+            max_entries=settings.SEMCACHE_MAX_ENTRIES
+        )
+    return client
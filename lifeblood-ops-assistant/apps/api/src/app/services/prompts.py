@@ -1,11 +1,14 @@
 """Prompt building service for RAG (Retrieval-Augmented Generation) responses."""
 
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 
+# Opening line of every prompt
+SYSTEM_INTRO = "You are a knowledgeable assistant answering questions about medical operations and procedures."
+
 # Core grounding rules that apply to all responses
 CORE_RULES = """
 CRITICAL INSTRUCTIONS:
@@ -36,6 +39,21 @@ Provide a simplified explanation that would be easy for anyone to understand. Us
 """
 }
 
+# Instructions for proper source citation
+CITATION_INSTRUCTIONS = """
+CITATION REQUIREMENTS:
+- When referencing information from sources, immediately cite the source number in square brackets [1], [2], etc.
+- If information comes from multiple sources, cite all relevant sources [1,2,3]
+- Place citations right after the relevant statement, not at the end of paragraphs
+- Every factual claim must have a citation unless it's a direct restatement of the question
+
+EXAMPLE:
+"Blood donors must be between 17-65 years old [1] and weigh at least 110 pounds [1,2]. The screening process includes a health questionnaire [3]."
+"""
+
+# First line of the formatted sources block
+SOURCES_HEADER = "SOURCES:\n"
+
 
 def format_sources(chunks: List[Dict[str, Any]]) -> str:
     """
@@ -50,7 +68,8 @@ def format_sources(chunks: List[Dict[str, Any]]) -> str:
     if not chunks:
         return "No sources provided."
     
-    sources_text = "SOURCES:\n"
+    # Collect parts and join once; repeated += on a growing string is quadratic
+    parts = [SOURCES_HEADER]
     
     for i, chunk in enumerate(chunks, 1):
         # Get chunk text
@@ -58,16 +77,29 @@ def format_sources(chunks: List[Dict[str, Any]]) -> str:
         if not text:
             continue
         
-        # Add source header with metadata if available
-        source_header = f"Source [{i}]"
-        if chunk.get('title'):
-            source_header += f" - {chunk['title']}"
-        if chunk.get('doc_id'):
-            source_header += f" (Document: {chunk['doc_id']})"
-        
-        sources_text += f"\n{source_header}:\n{text}\n"
+        parts.append(format_source(i, text, chunk.get('title'), chunk.get('doc_id')))
     
-    return sources_text
+    return "".join(parts)
+
+def format_source(number: int, text: str, title: Optional[str] = None, doc_id: Optional[str] = None) -> str:
+    """
+    Format one numbered source section.
+    
+    Joining SOURCES_HEADER and the sections gives the same text as format_sources.
+    
+    Args:
+        number: 1-based source number used for citations
+        text: Stripped source text
+        title: Optional document title
+        doc_id: Optional document identifier
+        
+    Returns:
+        Formatted source section
+    """
+    # Add source header with metadata if available
+    title_suffix = f" - {title}" if title else ""
+    doc_suffix = f" (Document: {doc_id})" if doc_id else ""
+    return f"\nSource [{number}]{title_suffix}{doc_suffix}:\n{text}\n"
 
 
 def get_mode_instructions(mode: str) -> str:
@@ -80,13 +112,22 @@ def get_mode_instructions(mode: str) -> str:
     Returns:
         Mode-specific instruction text
     """
+    return MODE_TEMPLATES[_resolve_mode(mode)]
+
+
+def _resolve_mode(mode: str) -> str:
+    """Normalize a mode name, falling back to 'general' for unknown modes."""
+    # Fast path: the API schema already restricts mode to the lowercase names
+    if mode in MODE_TEMPLATES:
+        return mode
+    
     mode = mode.lower().strip()
     
     if mode in MODE_TEMPLATES:
-        return MODE_TEMPLATES[mode]
+        return mode
     else:
         logger.warning(f"Unknown mode '{mode}', using 'general' mode")
-        return MODE_TEMPLATES["general"]
+        return "general"
 
 
 def build_citation_instructions() -> str:
@@ -96,16 +137,90 @@ def build_citation_instructions() -> str:
     Returns:
         Citation instruction text
     """
-    return """
-CITATION REQUIREMENTS:
-- When referencing information from sources, immediately cite the source number in square brackets [1], [2], etc.
-- If information comes from multiple sources, cite all relevant sources [1,2,3]
-- Place citations right after the relevant statement, not at the end of paragraphs
-- Every factual claim must have a citation unless it's a direct restatement of the question
+    return CITATION_INSTRUCTIONS
 
-EXAMPLE:
-"Blood donors must be between 17-65 years old [1] and weigh at least 110 pounds [1,2]. The screening process includes a health questionnaire [3]."
-"""
+
+# Everything in a RAG prompt that doesn't depend on the request, joined once per
+# mode at import. Prompts start with this block so provider-side prompt caching
+# can match it byte-for-byte; sources and the question always come after it.
+_STATIC_PREFIX_BY_MODE: Dict[str, str] = {
+    mode: "\n\n".join([
+        SYSTEM_INTRO,
+        CORE_RULES.strip(),
+        CITATION_INSTRUCTIONS.strip(),
+        template.strip(),
+    ]) + "\n\n"
+    for mode, template in MODE_TEMPLATES.items()
+}
+
+# Fixed parts of the prompt used when retrieval finds nothing
+_NO_SOURCES_PREFIX = (
+    f"{SYSTEM_INTRO}\n\n{CORE_RULES.strip()}\n\n"
+    "SOURCES:\nNo relevant sources found for this question.\n\n"
+)
+_NO_SOURCES_ANSWER = (
+    "I don't have access to relevant sources to answer your question about this topic. "
+    "Please try rephrasing your question or ask about a different aspect of medical operations."
+)
+
+
+def build_prompt_parts(question: str, chunks: List[Dict[str, Any]], mode: str = "general") -> Tuple[str, str]:
+    """
+    Build a RAG prompt split into its static prefix and per-request suffix.
+    
+    The prefix depends only on the mode, so clients that support prompt caching
+    can mark the boundary between the two parts as a cache breakpoint.
+    
+    Args:
+        question: The user's question to answer
+        chunks: List of retrieved document chunks with text and metadata
+        mode: Response mode - "general", "checklist", or "plain_english"
+        
+    Returns:
+        (static_prefix, dynamic_suffix); concatenated they form the full prompt
+    """
+    if not question.strip():
+        raise ValueError("Question cannot be empty")
+    
+    # Log prompt building
+    logger.debug("Building prompt for mode '%s' with %s source chunks", mode, len(chunks))
+    
+    return _prompt_parts(question, format_sources(chunks), mode)
+
+
+def _prompt_parts(question: str, sources_text: str, mode: str) -> Tuple[str, str]:
+    """Combine the static prefix for a mode with formatted sources and the question."""
+    prefix = _STATIC_PREFIX_BY_MODE[_resolve_mode(mode)]
+    suffix = f"{sources_text}\n\nQUESTION: {question.strip()}\n\nANSWER:"
+    return prefix, suffix
+
+
+def _prompt_text(question: str, sources_text: str, mode: str) -> str:
+    """Build the same text as joining _prompt_parts, in a single allocation."""
+    # One f-string copies the sources once; prefix + suffix would copy them twice
+    prefix = _STATIC_PREFIX_BY_MODE[_resolve_mode(mode)]
+    return f"{prefix}{sources_text}\n\nQUESTION: {question.strip()}\n\nANSWER:"
+
+
+def build_prompt_from_sources(question: str, sources_text: str, mode: str = "general") -> str:
+    """
+    Build a complete RAG prompt from an already formatted sources block.
+    
+    Lets callers that format sources while collecting them (see RAGPipeline)
+    skip a second pass over the chunks.
+    
+    Args:
+        question: The user's question to answer
+        sources_text: Sources formatted as by format_sources
+        mode: Response mode - "general", "checklist", or "plain_english"
+        
+    Returns:
+        Complete formatted prompt for the LLM
+    """
+    if not question.strip():
+        raise ValueError("Question cannot be empty")
+    
+    return _prompt_text(question, sources_text, mode)
 
 
 def build_prompt(question: str, chunks: List[Dict[str, Any]], mode: str = "general") -> str:
@@ -124,29 +239,11 @@ def build_prompt(question: str, chunks: List[Dict[str, Any]], mode: str = "gener
         raise ValueError("Question cannot be empty")
     
     # Log prompt building
-    logger.debug(f"Building prompt for mode '{mode}' with {len(chunks)} source chunks")
+    logger.debug("Building prompt for mode '%s' with %s source chunks", mode, len(chunks))
     
-    # Build prompt sections
-    sections = [
-        "You are a knowledgeable assistant answering questions about medical operations and procedures.",
-        "",
-        CORE_RULES.strip(),
-        "",
-        build_citation_instructions().strip(),
-        "",
-        get_mode_instructions(mode).strip(),
-        "",
-        format_sources(chunks),
-        "",
-        f"QUESTION: {question.strip()}",
-        "",
-        "ANSWER:"
-    ]
-    
-    # Join sections with proper spacing
-    prompt = "\n".join(sections)
-    
-    logger.debug(f"Generated prompt with {len(prompt)} characters")
+    prompt = _prompt_text(question, format_sources(chunks), mode)
+    
+    logger.debug("Generated prompt with %s characters", len(prompt))
     
     return prompt
 
@@ -162,23 +259,9 @@ def build_prompt_no_sources(question: str, mode: str = "general") -> str:
     Returns:
         Prompt indicating no sources available
     """
-    logger.debug(f"Building no-sources prompt for mode '{mode}'")
-    
-    sections = [
-        "You are a knowledgeable assistant answering questions about medical operations and procedures.",
-        "",
-        CORE_RULES.strip(),
-        "",
-        "SOURCES:",
-        "No relevant sources found for this question.",
-        "",
-        f"QUESTION: {question.strip()}",
-        "",
-        "ANSWER:",
-        "I don't have access to relevant sources to answer your question about this topic. Please try rephrasing your question or ask about a different aspect of medical operations."
-    ]
+    logger.debug("Building no-sources prompt for mode '%s'", mode)
     
-    return "\n".join(sections)
+    return f"{_NO_SOURCES_PREFIX}QUESTION: {question.strip()}\n\nANSWER:\n{_NO_SOURCES_ANSWER}"
 
 
 def validate_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -204,7 +287,7 @@ def validate_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         
         valid_chunks.append(chunk)
     
-    logger.debug(f"Validated {len(valid_chunks)} out of {len(chunks)} chunks")
+    logger.debug("Validated %s out of %s chunks", len(valid_chunks), len(chunks))
     return valid_chunks
 
 
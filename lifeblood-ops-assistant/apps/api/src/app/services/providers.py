@@ -0,0 +1,102 @@
+"""Process-wide cached LangChain components and RAG pipeline."""
+
+import logging
+import threading
+from typing import Any, Dict, Tuple
+
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
+from langchain_chroma import Chroma
+
+from .langchain_factory import build_lc_components, clear_lc_client_cache
+from .rag_pipeline import RAGPipeline
+from .semantic_cache import SemanticAnswerCache
+from ..core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Settings is a mutable Pydantic model and not hashable, so components are
+# cached by the subset of fields that actually affects how they are built.
+_components_cache: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+_components_lock = threading.Lock()
+
+
+def _settings_key(config: Settings) -> Tuple[str, ...]:
+    """Build a hashable cache key from the settings that shape the components."""
+    return (
+        config.LLM_PROVIDER,
+        config.EMBED_PROVIDER,
+        config.GEMINI_MODEL,
+        config.GEMINI_EMBED_MODEL,
+        config.CHROMA_PERSIST_DIR,
+    )
+
+
+def _get_cached_components(config: Settings) -> Dict[str, Any]:
+    """
+    Get the LangChain components and RAG pipeline for the given settings.
+    
+    Components are built on first use and reused for the lifetime of the process.
+    
+    Args:
+        config: Application settings
+        
+    Returns:
+        Dictionary with 'embeddings', 'llm', 'vectorstore' and 'pipeline' keys
+    """
+    key = _settings_key(config)
+    components = _components_cache.get(key)
+    if components is not None:
+        return components
+    
+    with _components_lock:
+        # Another request may have finished building while we waited
+        components = _components_cache.get(key)
+        if components is None:
+            logger.info("Building cached LangChain components")
+            components = build_lc_components(config)
+            semantic_cache = None
+            if config.ANSWER_SEMCACHE_ENABLED:
+                logger.info("Enabling semantic answer cache (threshold %s)", config.ANSWER_SEMCACHE_THRESHOLD)
+                semantic_cache = SemanticAnswerCache(
+                    threshold=config.ANSWER_SEMCACHE_THRESHOLD,
+                    max_entries=config.ANSWER_SEMCACHE_MAX_ENTRIES,
+                    ttl_seconds=config.ANSWER_SEMCACHE_TTL_SECONDS
+                )
+            components['pipeline'] = RAGPipeline(
+                vectorstore=components['vectorstore'],
+                embeddings=components['embeddings'],
+                llm=components['llm'],
+                answer_cache_size=config.ANSWER_CACHE_SIZE,
+                semantic_cache=semantic_cache,
+                query_embedding_cache_size=config.QUERY_EMBED_CACHE_SIZE
+            )
+            _components_cache[key] = components
+    
+    return components
+
+
+def get_cached_embeddings(config: Settings) -> GoogleGenerativeAIEmbeddings:
+    """Get the shared LangChain embeddings instance."""
+    return _get_cached_components(config)['embeddings']
+
+
+def get_cached_vectorstore(config: Settings) -> Chroma:
+    """Get the shared LangChain Chroma vector store."""
+    return _get_cached_components(config)['vectorstore']
+
+
+def get_cached_llm(config: Settings) -> ChatGoogleGenerativeAI:
+    """Get the shared LangChain chat model."""
+    return _get_cached_components(config)['llm']
+
+
+def get_rag_pipeline(config: Settings) -> RAGPipeline:
+    """Get the shared RAG pipeline built from the cached components."""
+    return _get_cached_components(config)['pipeline']
+
+
+def clear_provider_cache() -> None:
+    """Drop all cached components so the next call rebuilds them."""
+    with _components_lock:
+        _components_cache.clear()
+        clear_lc_client_cache()
@@ -1,17 +1,37 @@
 """RAG (Retrieval-Augmented Generation) pipeline implementation."""
 
+import asyncio
+import hashlib
+import inspect
 import logging
-from typing import Dict, List, Any, Tuple
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional, Sequence, Tuple
 
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
 
-from .prompts import build_rag_prompt
+from .chroma_search import search_by_vectors
+from .semantic_cache import SemanticAnswerCache
+from .prompts import SOURCES_HEADER, build_prompt_from_sources, format_source
+from ..utils.chunking import SNIPPET_MAX_CHARS, create_snippet
 from ..core.config import Settings
 
 logger = logging.getLogger(__name__)
 
+# Fixed answers returned instead of an LLM response
+_EMPTY_QUESTION_ANSWER = "Please provide a specific question for me to answer."
+_NO_INFORMATION_ANSWER = "I don't have enough information in the docs to answer that."
+_NOT_INGESTED_ANSWER = (
+    f"{_NO_INFORMATION_ANSWER} Please make sure documents have been ingested using the /ingest endpoint first."
+)
+_RETRIEVAL_ERROR_ANSWER = "I encountered an error searching for relevant information. Please try again."
+_PREPARE_ERROR_ANSWER = "I encountered an error preparing the response. Please try again."
+_GENERATION_ERROR_ANSWER = "I encountered an error generating the response. Please try again."
+_UNEXPECTED_ERROR_ANSWER = "I encountered an unexpected error. Please try again."
+_EMPTY_RESPONSE_ANSWER = "I was unable to generate a response."
+
 
 class RAGPipeline:
     """
@@ -23,7 +43,10 @@ class RAGPipeline:
         self,
         vectorstore: Chroma,
         embeddings: GoogleGenerativeAIEmbeddings,
-        llm: ChatGoogleGenerativeAI
+        llm: ChatGoogleGenerativeAI,
+        answer_cache_size: int = 1024,
+        semantic_cache: Optional[SemanticAnswerCache] = None,
+        query_embedding_cache_size: int = 4096
     ):
         """
         Initialize RAG pipeline with LangChain components.
@@ -32,10 +55,28 @@ class RAGPipeline:
             vectorstore: LangChain Chroma vector store
             embeddings: LangChain Google GenerativeAI embeddings
             llm: LangChain Google GenerativeAI chat model
+            answer_cache_size: Successful answers kept in the exact-match LRU cache (0 disables)
+            semantic_cache: Optional cache answering near-duplicate questions; when
+                set, each question is embedded once and reused for the search
+            query_embedding_cache_size: Question embeddings kept in an LRU cache
+                for the paths that embed questions themselves (0 disables)
         """
         self.vectorstore = vectorstore
         self.embeddings = embeddings
         self.llm = llm
+        self.semantic_cache = semantic_cache
+        
+        # (normalized question digest, mode, top_k) -> result, most recently used last
+        self.answer_cache_size = answer_cache_size
+        self._answer_cache: "OrderedDict[Tuple[bytes, str, int], Dict[str, Any]]" = OrderedDict()
+        self._answer_cache_lock = threading.Lock()
+        
+        # normalized question -> query embedding, most recently used last. Kept
+        # across clear_answer_cache: a question's embedding does not depend on
+        # what is indexed
+        self.query_embedding_cache_size = query_embedding_cache_size
+        self._query_embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_embedding_cache_lock = threading.Lock()
         
         logger.info("RAG pipeline initialized with LangChain components")
     
@@ -43,6 +84,11 @@ class RAGPipeline:
         """
         Process a question through the full RAG pipeline.
         
+        Repeated questions (compared case- and whitespace-insensitively) with the
+        same mode and top_k are answered from an LRU cache without retrieval or
+        generation. Successful answers and "not enough information" fallbacks are
+        cached; errors are not.
+        
         Args:
             question: User question to answer
             mode: Response mode ("general", "checklist", "plain_english")
@@ -51,208 +97,672 @@ class RAGPipeline:
         Returns:
             Dictionary with 'answer' and 'citations' keys
         """
+        cache_key = self._answer_cache_key(question, mode, top_k) if question else None
+        cached = self._get_cached_answer(cache_key)
+        if cached is not None:
+            logger.info("Answer cache hit (mode=%s, top_k=%s)", mode, top_k)
+            return cached
+        
         try:
-            logger.info(f"Processing RAG query: '{question}' (mode={mode}, top_k={top_k})")
+            logger.info("Processing RAG query: '%s' (mode=%s, top_k=%s)", question, mode, top_k)
             
             # Validate input
             if not question or not question.strip():
                 return {
-                    "answer": "Please provide a specific question for me to answer.",
+                    "answer": _EMPTY_QUESTION_ANSWER,
                     "citations": []
                 }
             
             # Step 1: Retrieve documents with scores using LangChain
-            logger.debug(f"Retrieving top {top_k} documents with relevance scores")
+            logger.debug("Retrieving top %s documents with relevance scores", top_k)
+            query_vector = None
             try:
+                if self.semantic_cache is not None:
+                    # Embed once for both the semantic cache lookup and the search
+                    query_vector = self._embed_question(question)
+                    cached = self.semantic_cache.lookup(query_vector, (mode, top_k))
+                    if cached is not None:
+                        return dict(cached)
+                    retrieved_docs_with_scores = self._search_by_vectors([query_vector], [top_k])[0]
                 # Try similarity_search_with_relevance_scores first (preferred)
-                if hasattr(self.vectorstore, 'similarity_search_with_relevance_scores'):
+                elif hasattr(self.vectorstore, 'similarity_search_with_relevance_scores'):
                     retrieved_docs_with_scores = self.vectorstore.similarity_search_with_relevance_scores(
                         question.strip(), k=top_k
                     )
-                    logger.debug(f"Retrieved {len(retrieved_docs_with_scores)} documents with relevance scores")
+                    logger.debug("Retrieved %s documents with relevance scores", len(retrieved_docs_with_scores))
                 else:
                     # Fallback to similarity_search_with_score
                     retrieved_docs_with_scores = self.vectorstore.similarity_search_with_score(
                         question.strip(), k=top_k
                     )
-                    logger.debug(f"Retrieved {len(retrieved_docs_with_scores)} documents with scores (fallback method)")
+                    logger.debug("Retrieved %s documents with scores (fallback method)", len(retrieved_docs_with_scores))
                 
             except Exception as e:
-                logger.error(f"Error retrieving documents: {e}")
-                # Check if it's because no data is indexed yet
-                if "does not exist" in str(e).lower() or "not found" in str(e).lower() or "empty" in str(e).lower():
-                    logger.info("No data indexed yet, returning fallback")
-                    return {
-                        "answer": "I don't have enough information in the docs to answer that. Please make sure documents have been ingested using the /ingest endpoint first.",
-                        "citations": []
-                    }
-                return {
-                    "answer": "I encountered an error searching for relevant information. Please try again.",
-                    "citations": []
-                }
-            
-            # Step 2: Convert LangChain Documents to citations
-            logger.debug(f"Converting {len(retrieved_docs_with_scores)} LangChain documents to citations")
-            citations = self._convert_langchain_docs_to_citations(retrieved_docs_with_scores)
+                return self._retrieval_error_result(e)
             
-            # Step 3: Filter meaningful results
-            meaningful_citations = self._filter_meaningful_citations(citations)
-            
-            if not meaningful_citations:
-                logger.info("No meaningful citations found, returning fallback")
-                return {
-                    "answer": "I don't have enough information in the docs to answer that.",
-                    "citations": []
-                }
-            
-            # Step 4: Convert citations to chunks format for existing prompt builder
-            logger.debug(f"Building prompt with {len(meaningful_citations)} citations")
-            chunks_for_prompt = self._citations_to_chunks(meaningful_citations)
-            
-            try:
-                prompt = build_rag_prompt(question.strip(), chunks_for_prompt, mode)
-                logger.debug(f"Built prompt length: {len(prompt)} characters")
-            except Exception as e:
-                logger.error(f"Error building prompt: {e}")
-                return {
-                    "answer": "I encountered an error preparing the response. Please try again.",
-                    "citations": []
-                }
+            # Steps 2-4: Build citations and the prompt
+            prompt, meaningful_citations, fallback = self._prepare_prompt(
+                question.strip(), mode, retrieved_docs_with_scores
+            )
+            if fallback is not None:
+                return self._finish_fallback(cache_key, fallback)
             
             # Step 5: Generate answer using LangChain LLM
             logger.debug("Generating LLM response with LangChain")
             try:
                 response = self.llm.invoke(prompt)
-                
-                # Extract text from LangChain response
-                if hasattr(response, 'text') and response.text:
-                    llm_response = response.text
-                elif hasattr(response, 'content') and response.content:
-                    llm_response = response.content
-                else:
-                    llm_response = str(response)
-                    
                 logger.debug("Successfully generated response with LangChain LLM")
                 
             except Exception as e:
                 logger.error(f"Error generating LLM response: {e}")
-                return {
-                    "answer": "I encountered an error generating the response. Please try again.",
-                    "citations": []
-                }
+                return self._generation_error_result()
             
             # Step 6: Return final result
-            result = {
-                "answer": llm_response.strip() if llm_response else "I was unable to generate a response.",
-                "citations": meaningful_citations
+            result = self._build_result(response, meaningful_citations)
+            
+            logger.info("RAG pipeline completed successfully with %s citations", len(meaningful_citations))
+            self._cache_answer(cache_key, result)
+            self._cache_semantic_answer(query_vector, mode, top_k, result)
+            return result
+        
+        except Exception as e:
+            logger.error("Unexpected error in RAG pipeline: %s", e)
+            return {
+                "answer": _UNEXPECTED_ERROR_ANSWER,
+                "citations": []
             }
+    
+    async def ask_async(self, question: str, mode: str = "general", top_k: int = 5) -> Dict[str, Any]:
+        """
+        Process a question like ask(), awaiting retrieval and generation.
+        
+        Uses LangChain's async search and ainvoke, so concurrent requests
+        overlap their network waits on the event loop instead of each holding
+        a worker thread. Caching and fallbacks match ask().
+        
+        Args:
+            question: User question to answer
+            mode: Response mode ("general", "checklist", "plain_english")
+            top_k: Number of top chunks to retrieve
+            
+        Returns:
+            Dictionary with 'answer' and 'citations' keys
+        """
+        cache_key = self._answer_cache_key(question, mode, top_k) if question else None
+        cached = self._get_cached_answer(cache_key)
+        if cached is not None:
+            logger.info("Answer cache hit (mode=%s, top_k=%s)", mode, top_k)
+            return cached
+        
+        try:
+            logger.info("Processing RAG query: '%s' (mode=%s, top_k=%s)", question, mode, top_k)
+            
+            # Steps 1-4: Retrieve documents and build citations and the prompt
+            finished, prompt, meaningful_citations, query_vector = await self._aprepare_answer(
+                question, mode, top_k, cache_key
+            )
+            if finished is not None:
+                return finished
             
-            logger.info(f"RAG pipeline completed successfully with {len(meaningful_citations)} citations")
+            # Step 5: Generate answer using LangChain LLM
+            try:
+                response = await self.llm.ainvoke(prompt)
+            except Exception as e:
+                logger.error("Error generating LLM response: %s", e)
+                return self._generation_error_result()
+            
+            # Step 6: Return final result
+            result = self._build_result(response, meaningful_citations)
+            
+            logger.info("RAG pipeline completed successfully with %s citations", len(meaningful_citations))
+            self._cache_answer(cache_key, result)
+            self._cache_semantic_answer(query_vector, mode, top_k, result)
             return result
             
         except Exception as e:
             logger.error(f"Unexpected error in RAG pipeline: {e}")
             return {
-                "answer": "I encountered an unexpected error. Please try again.",
+                "answer": _UNEXPECTED_ERROR_ANSWER,
                 "citations": []
             }
     
-    def _convert_langchain_docs_to_citations(self, docs_with_scores: List[Tuple[Document, float]]) -> List[Dict[str, Any]]:
+    async def ask_stream(
+        self,
+        question: str,
+        mode: str = "general",
+        top_k: int = 5
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        Convert LangChain Documents with scores to Citation format.
+        Process a question like ask_async(), streaming the answer as it is generated.
+        
+        The first event is {"citations": [...]}, sent as soon as retrieval is
+        done so a client can show sources before the answer arrives; it is
+        followed by {"delta": text} events from llm.astream. Cached answers and
+        fallbacks are sent as a single delta. The complete answer is cached as
+        ask_async() would cache it.
         
         Args:
-            docs_with_scores: List of tuples (Document, score) from LangChain similarity search
+            question: User question to answer
+            mode: Response mode ("general", "checklist", "plain_english")
+            top_k: Number of top chunks to retrieve
             
+        Yields:
+            Event dictionaries with either a 'citations' or a 'delta' key
+        """
+        cache_key = self._answer_cache_key(question, mode, top_k) if question else None
+        finished = self._get_cached_answer(cache_key)
+        if finished is not None:
+            logger.info("Answer cache hit (mode=%s, top_k=%s)", mode, top_k)
+        else:
+            logger.info("Processing streamed RAG query: '%s' (mode=%s, top_k=%s)", question, mode, top_k)
+            try:
+                finished, prompt, citations, query_vector = await self._aprepare_answer(
+                    question, mode, top_k, cache_key
+                )
+            except Exception as e:
+                logger.error("Unexpected error in RAG pipeline: %s", e)
+                finished = {
+                    "answer": _UNEXPECTED_ERROR_ANSWER,
+                    "citations": []
+                }
+        
+        if finished is not None:
+            yield {"citations": finished["citations"]}
+            yield {"delta": finished["answer"]}
+            return
+        
+        yield {"citations": citations}
+        
+        # Step 5: Stream the answer from the LangChain LLM
+        parts = []
+        try:
+            async for chunk in self.llm.astream(prompt):
+                text = self._chunk_text(chunk)
+                if text:
+                    parts.append(text)
+                    yield {"delta": text}
+        except Exception as e:
+            logger.error("Error streaming LLM response: %s", e)
+            # Text already sent cannot be taken back, so only an answer that
+            # never started is replaced by the error message
+            if not parts:
+                yield {"delta": _GENERATION_ERROR_ANSWER}
+            return
+        
+        # Step 6: Cache the complete answer
+        answer = "".join(parts).strip()
+        if not answer:
+            answer = _EMPTY_RESPONSE_ANSWER
+            yield {"delta": answer}
+        result = {
+            "answer": answer,
+            "citations": citations
+        }
+        logger.info("Streamed RAG answer completed with %s citations", len(citations))
+        self._cache_answer(cache_key, result)
+        self._cache_semantic_answer(query_vector, mode, top_k, result)
+    
+    async def _aprepare_answer(
+        self,
+        question: str,
+        mode: str,
+        top_k: int,
+        cache_key: Optional[Tuple[bytes, str, int]]
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str], List[Dict[str, Any]], Optional[Sequence[float]]]:
+        """
+        Retrieve documents and build the prompt for ask_async and ask_stream.
+        
         Returns:
-            List of citation dictionaries
+            (finished, prompt, citations, query_vector); finished is a ready
+            result (semantic cache hit or fallback) when nothing should be
+            generated, otherwise None
         """
-        citations = []
+        # Validate input
+        if not question or not question.strip():
+            return {
+                "answer": _EMPTY_QUESTION_ANSWER,
+                "citations": []
+            }, None, [], None
         
-        for doc, score in docs_with_scores:
-            citation = {
-                "doc_id": doc.metadata.get('doc_id', 'unknown'),
-                "title": doc.metadata.get('title'),
-                "chunk_id": doc.metadata.get('chunk_id'),
-                "snippet": self._create_snippet(doc.page_content),
-                "score": score
-            }
-            citations.append(citation)
+        # Step 1: Retrieve documents with scores using LangChain
+        query_vector = None
+        try:
+            if self.semantic_cache is not None:
+                # Embed once for both the semantic cache lookup and the search
+                query_vector = await self._aembed_question(question)
+                cached = self.semantic_cache.lookup(query_vector, (mode, top_k))
+                if cached is not None:
+                    return dict(cached), None, [], None
+                # Chroma searches are local and blocking, so keep them off the event loop
+                retrieved_docs_with_scores = (await asyncio.to_thread(
+                    self._search_by_vectors, [query_vector], [top_k]
+                ))[0]
+            else:
+                retrieved_docs_with_scores = await self.vectorstore.asimilarity_search_with_relevance_scores(
+                    question.strip(), k=top_k
+                )
+            logger.debug("Retrieved %s documents with relevance scores", len(retrieved_docs_with_scores))
+        except Exception as e:
+            return self._retrieval_error_result(e), None, [], None
         
-        logger.debug(f"Converted {len(citations)} LangChain documents to citations")
-        return citations
-
-    def _filter_meaningful_citations(self, citations: List[Dict[str, Any]], min_score: float = 0.01) -> List[Dict[str, Any]]:
+        # Steps 2-4: Build citations and the prompt
+        prompt, meaningful_citations, fallback = self._prepare_prompt(
+            question.strip(), mode, retrieved_docs_with_scores
+        )
+        if fallback is not None:
+            return self._finish_fallback(cache_key, fallback), None, [], None
+        return None, prompt, meaningful_citations, query_vector
+    
+    def ask_batch(
+        self,
+        requests: Sequence[Tuple[str, str, int]],
+        on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Filter citations to only include meaningful results.
+        Answer several questions together, sharing the network round trips.
+        
+        All uncached questions are embedded in one embeddings request and their
+        prompts are generated concurrently with llm.batch_as_completed; Chroma
+        is searched once for all the precomputed vectors. Each result matches
+        what ask() would return for the same question.
         
         Args:
-            citations: List of citations with scores
-            min_score: Minimum relevance score threshold
+            requests: (question, mode, top_k) tuples
+            on_result: Optional callback given (index, result) as soon as each
+                result is ready, so short answers need not wait for long ones
             
         Returns:
-            List of citations that meet meaningfulness criteria
+            Result dictionaries in the same order as requests
         """
-        if not citations:
-            return []
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
         
-        meaningful_citations = []
+        def report(i: int, result: Dict[str, Any]) -> None:
+            results[i] = result
+            if on_result is not None:
+                on_result(i, result)
         
-        for citation in citations:
-            # Check if citation has required fields
-            if not isinstance(citation, dict):
-                continue
-                
-            snippet = citation.get('snippet', '').strip()
-            if not snippet:
+        pending = []
+        for i, (question, mode, top_k) in enumerate(requests):
+            if not question or not question.strip():
+                report(i, self.ask(question, mode, top_k))
                 continue
+            cached = self._get_cached_answer(self._answer_cache_key(question, mode, top_k))
+            if cached is not None:
+                report(i, cached)
+            else:
+                pending.append(i)
+        
+        if pending:
+            logger.info("Processing batch of %s RAG queries", len(pending))
+            try:
+                self._answer_batch(requests, pending, report)
+            except Exception as e:
+                logger.error("Unexpected error in RAG batch: %s", e)
+                for i in pending:
+                    if results[i] is None:
+                        report(i, {
+                            "answer": _UNEXPECTED_ERROR_ANSWER,
+                            "citations": []
+                        })
+        
+        return results
+    
+    def _answer_batch(
+        self,
+        requests: Sequence[Tuple[str, str, int]],
+        pending: List[int],
+        report: Callable[[int, Dict[str, Any]], None]
+    ) -> None:
+        """Report a result for each pending request index, sharing embedding and LLM calls."""
+        try:
+            # Step 1: Embed every uncached question in one request and search
+            # for all of them together
+            vectors = self._embed_questions([requests[i][0] for i in pending])
+            if self.semantic_cache is not None:
+                pending, vectors = self._answer_from_semantic_cache(requests, pending, vectors, report)
+                if not pending:
+                    return
+            docs_per_question = self._search_by_vectors(vectors, [requests[i][2] for i in pending])
+        except Exception as e:
+            error_result = self._retrieval_error_result(e)
+            for i in pending:
+                report(i, dict(error_result))
+            return
+        
+        prompts = []
+        prompt_owners = []
+        for i, vector, docs_with_scores in zip(pending, vectors, docs_per_question):
+            question, mode, top_k = requests[i]
             
-            # Check relevance score
-            score = citation.get('score', 0.0)
-            if score < min_score:
-                logger.debug(f"Filtering out citation with low score: {score} (min: {min_score})")
+            # Steps 2-4: Build citations and the prompt
+            prompt, citations, fallback = self._prepare_prompt(question.strip(), mode, docs_with_scores)
+            if fallback is not None:
+                report(i, self._finish_fallback(self._answer_cache_key(question, mode, top_k), fallback))
                 continue
+            prompts.append(prompt)
+            prompt_owners.append((i, vector, citations))
+        
+        if prompts:
+            # Step 5: Generate all answers concurrently; each is reported as soon
+            # as it finishes and failures stay per question
+            logger.debug("Generating %s LLM responses with LangChain batch", len(prompts))
+            for index, response in self.llm.batch_as_completed(prompts, return_exceptions=True):
+                i, vector, citations = prompt_owners[index]
+                if isinstance(response, Exception):
+                    logger.error("Error generating LLM response: %s", response)
+                    report(i, self._generation_error_result())
+                    continue
+                
+                # Step 6: Report the final result
+                result = self._build_result(response, citations)
+                question, mode, top_k = requests[i]
+                self._cache_answer(self._answer_cache_key(question, mode, top_k), result)
+                self._cache_semantic_answer(vector, mode, top_k, result)
+                report(i, result)
+        
+        logger.info("RAG batch completed for %s queries", len(pending))
+    
+    def _answer_from_semantic_cache(
+        self,
+        requests: Sequence[Tuple[str, str, int]],
+        pending: List[int],
+        vectors: Sequence[Sequence[float]],
+        report: Callable[[int, Dict[str, Any]], None]
+    ) -> Tuple[List[int], List[Sequence[float]]]:
+        """Report semantic cache hits and return the request indices and vectors still unanswered."""
+        misses, miss_vectors = [], []
+        for i, vector in zip(pending, vectors):
+            cached = self.semantic_cache.lookup(vector, (requests[i][1], requests[i][2]))
+            if cached is not None:
+                report(i, dict(cached))
+            else:
+                misses.append(i)
+                miss_vectors.append(vector)
+        return misses, miss_vectors
+    
+    def _search_by_vectors(
+        self,
+        vectors: Sequence[Sequence[float]],
+        top_ks: Sequence[int]
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Retrieve documents with relevance scores for several query vectors.
+        
+        Args:
+            vectors: Query embeddings
+            top_ks: Number of documents to return for each vector
             
-            # Check snippet length (too short snippets are usually not helpful)
-            if len(snippet) < 20:
-                logger.debug("Filtering out citation with very short snippet")
-                continue
+        Returns:
+            (Document, relevance score) lists, one per vector
+        """
+        return search_by_vectors(self.vectorstore, vectors, top_ks)
+    
+    def _retrieval_error_result(self, error: Exception) -> Dict[str, Any]:
+        """Build the fallback result for a failed vector store search."""
+        logger.error("Error retrieving documents: %s", error)
+        # Check if it's because no data is indexed yet
+        message = str(error).lower()
+        if "does not exist" in message or "not found" in message or "empty" in message:
+            logger.info("No data indexed yet, returning fallback")
+            return {
+                "answer": _NOT_INGESTED_ANSWER,
+                "citations": []
+            }
+        return {
+            "answer": _RETRIEVAL_ERROR_ANSWER,
+            "citations": []
+        }
+    
+    def _generation_error_result(self) -> Dict[str, Any]:
+        """Build the fallback result for a failed LLM call."""
+        return {
+            "answer": _GENERATION_ERROR_ANSWER,
+            "citations": []
+        }
+    
+    def _prepare_prompt(
+        self,
+        question: str,
+        mode: str,
+        docs_with_scores: List[Tuple[Document, float]]
+    ) -> Tuple[Optional[str], List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Build citations and the LLM prompt for retrieved documents.
+        
+        Args:
+            question: Stripped user question
+            mode: Response mode
+            docs_with_scores: Retrieved (Document, relevance score) pairs
             
-            meaningful_citations.append(citation)
+        Returns:
+            (prompt, citations, fallback); fallback is a ready result when no
+            prompt should be sent, otherwise None
+        """
+        logger.debug("Preparing citations from %s LangChain documents", len(docs_with_scores))
+        citations, sources_text = self._prepare_citations(docs_with_scores)
         
-        logger.debug(f"Filtered {len(meaningful_citations)} meaningful citations from {len(citations)} total")
-        return meaningful_citations
-
-    def _citations_to_chunks(self, citations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not citations:
+            logger.info("No meaningful citations found, returning fallback")
+            return None, [], {
+                "answer": _NO_INFORMATION_ANSWER,
+                "citations": []
+            }
+        
+        # Build the prompt from the already formatted sources
+        logger.debug("Building prompt with %s citations", len(citations))
+        try:
+            prompt = build_prompt_from_sources(question, sources_text, mode)
+            logger.debug("Built prompt length: %s characters", len(prompt))
+        except Exception as e:
+            logger.error("Error building prompt: %s", e)
+            return None, [], {
+                "answer": _PREPARE_ERROR_ANSWER,
+                "citations": []
+            }
+        
+        return prompt, citations, None
+    
+    def _finish_fallback(
+        self,
+        cache_key: Optional[Tuple[bytes, str, int]],
+        fallback: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Return a _prepare_prompt fallback, caching it when it is a stable no-information answer."""
+        # The same question keeps retrieving nothing useful until new documents
+        # are ingested (which clears the cache), so skip retrieval next time
+        if fallback["answer"] == _NO_INFORMATION_ANSWER:
+            self._cache_answer(cache_key, fallback)
+        return fallback
+    
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """Extract the text of one streamed LangChain message chunk."""
+        text = getattr(chunk, 'text', None) or getattr(chunk, 'content', None)
+        return text if isinstance(text, str) else ""
+    
+    def _build_result(self, response: Any, citations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extract the answer text from a LangChain response and pair it with citations."""
+        # Extract text from LangChain response
+        if hasattr(response, 'text') and response.text:
+            llm_response = response.text
+        elif hasattr(response, 'content') and response.content:
+            llm_response = response.content
+        else:
+            llm_response = str(response)
+        
+        return {
+            "answer": llm_response.strip() if llm_response else _EMPTY_RESPONSE_ANSWER,
+            "citations": citations
+        }
+    
+    @staticmethod
+    def _query_embedding_key(question: str) -> str:
+        """Normalize a question the way the answer cache does."""
+        return question.strip().lower()
+    
+    def _get_cached_query_vector(self, key: str) -> Optional[List[float]]:
+        """Return the cached embedding for a normalized question and mark it recently used."""
+        if self.query_embedding_cache_size <= 0:
+            return None
+        with self._query_embedding_cache_lock:
+            vector = self._query_embedding_cache.get(key)
+            if vector is not None:
+                self._query_embedding_cache.move_to_end(key)
+            return vector
+    
+    def _cache_query_vector(self, key: str, vector: Sequence[float]) -> None:
+        """Store a question embedding, evicting the least recently used entry when full."""
+        if self.query_embedding_cache_size <= 0:
+            return
+        with self._query_embedding_cache_lock:
+            self._query_embedding_cache[key] = list(vector)
+            self._query_embedding_cache.move_to_end(key)
+            while len(self._query_embedding_cache) > self.query_embedding_cache_size:
+                self._query_embedding_cache.popitem(last=False)
+    
+    def _embed_question(self, question: str) -> List[float]:
+        """Embed a question with embed_query, reusing the cached vector for repeats."""
+        key = self._query_embedding_key(question)
+        vector = self._get_cached_query_vector(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(question.strip())
+            self._cache_query_vector(key, vector)
+        return vector
+    
+    async def _aembed_question(self, question: str) -> List[float]:
+        """Embed a question like _embed_question, awaiting the embeddings request."""
+        key = self._query_embedding_key(question)
+        vector = self._get_cached_query_vector(key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(question.strip())
+            self._cache_query_vector(key, vector)
+        return vector
+    
+    def _embed_questions(self, questions: Sequence[str]) -> List[List[float]]:
         """
-        Convert citations back to chunks format for prompt building.
+        Embed several questions, reusing cached vectors for repeats.
+        
+        Embeddings whose embed_documents takes a task_type (Gemini) get the
+        uncached questions in a single request with the query task type; other
+        embeddings are called with embed_query per question, since their
+        embed_documents may encode queries differently.
+        """
+        keys = [self._query_embedding_key(question) for question in questions]
+        vectors = [self._get_cached_query_vector(key) for key in keys]
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if misses:
+            texts = [questions[i].strip() for i in misses]
+            if 'task_type' in inspect.signature(self.embeddings.embed_documents).parameters:
+                embedded = self.embeddings.embed_documents(texts, task_type="RETRIEVAL_QUERY")
+            else:
+                embedded = [self.embeddings.embed_query(text) for text in texts]
+            for i, vector in zip(misses, embedded):
+                vectors[i] = vector
+                self._cache_query_vector(keys[i], vector)
+        return vectors
+    
+    @staticmethod
+    def _answer_cache_key(question: str, mode: str, top_k: int) -> Tuple[bytes, str, int]:
+        """Build the answer cache key for a question, mode and top_k."""
+        # Questions have no length limit, so the cache holds a fixed-size digest
+        # of the normalized question rather than the question itself
+        digest = hashlib.blake2b(question.strip().lower().encode('utf-8'), digest_size=16).digest()
+        return digest, mode, top_k
+    
+    def _get_cached_answer(self, key: Optional[Tuple[bytes, str, int]]) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result for a key and mark it recently used."""
+        if key is None or self.answer_cache_size <= 0:
+            return None
+        with self._answer_cache_lock:
+            result = self._answer_cache.get(key)
+            if result is None:
+                return None
+            self._answer_cache.move_to_end(key)
+        return dict(result)
+    
+    def _cache_answer(self, key: Optional[Tuple[bytes, str, int]], result: Dict[str, Any]) -> None:
+        """Store a result, evicting the least recently used entry when full."""
+        if key is None or self.answer_cache_size <= 0:
+            return
+        with self._answer_cache_lock:
+            self._answer_cache[key] = dict(result)
+            self._answer_cache.move_to_end(key)
+            while len(self._answer_cache) > self.answer_cache_size:
+                self._answer_cache.popitem(last=False)
+    
+    def _cache_semantic_answer(
+        self,
+        query_vector: Optional[Sequence[float]],
+        mode: str,
+        top_k: int,
+        result: Dict[str, Any]
+    ) -> None:
+        """Store a successful answer in the semantic cache, if it is enabled."""
+        if self.semantic_cache is not None and query_vector is not None:
+            self.semantic_cache.store(query_vector, (mode, top_k), dict(result))
+    
+    def clear_answer_cache(self) -> None:
+        """Drop all cached answers, e.g. after new documents are indexed."""
+        with self._answer_cache_lock:
+            self._answer_cache.clear()
+        if self.semantic_cache is not None:
+            self.semantic_cache.clear()
+    
+    def _prepare_citations(
+        self,
+        docs_with_scores: List[Tuple[Document, float]],
+        min_score: float = 0.01
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Turn retrieved documents into meaningful citations and their prompt sources.
+        
+        Filtering, snippet creation, citation building and source formatting
+        happen in a single pass, so each document's text is stripped once.
         
         Args:
-            citations: List of citation dictionaries
+            docs_with_scores: List of tuples (Document, score) from LangChain similarity search
+            min_score: Minimum relevance score threshold
             
         Returns:
-            List of chunk dictionaries compatible with build_rag_prompt
+            (citations, sources_text) for the documents that meet the meaningfulness
+            criteria; sources are numbered in citation order
         """
-        chunks = []
-        
-        for citation in citations:
-            chunk = {
-                'doc_id': citation.get('doc_id', 'unknown'),
-                'chunk_id': citation.get('chunk_id'),
-                'title': citation.get('title'),
-                'text': citation.get('snippet', ''),
-                'start': citation.get('start'),
-                'end': citation.get('end'),
-                'score': citation.get('score', 0.0)
-            }
-            chunks.append(chunk)
+        citations = []
+        source_parts = [SOURCES_HEADER]
         
-        return chunks
-
-    # Note: _filter_meaningful_chunks and _build_citations methods removed 
-    # as they're replaced by _filter_meaningful_citations and _convert_langchain_docs_to_citations
+        for doc, score in docs_with_scores:
+            # Check relevance score first so rejected documents are never snippeted
+            if score < min_score:
+                logger.debug("Filtering out citation with low score: %s (min: %s)", score, min_score)
+                continue
+            
+            # Snippets are what the prompt quotes, so filter on them; too short
+            # (or empty) snippets are usually not helpful. Chunks ingested with
+            # a precomputed snippet skip the scan; older ones are snippeted here
+            metadata = doc.metadata
+            snippet = metadata.get('snippet')
+            if snippet is None:
+                snippet = self._create_snippet(doc.page_content)
+            if len(snippet) < 20:
+                logger.debug("Filtering out citation with very short snippet")
+                continue
+            
+            doc_id = metadata.get('doc_id', 'unknown')
+            title = metadata.get('title')
+            citations.append({
+                "doc_id": doc_id,
+                "title": title,
+                "chunk_id": metadata.get('chunk_id'),
+                "snippet": snippet,
+                # Plain float, so NumPy scalars from a store never reach the JSON encoder
+                "score": float(score)
+            })
+            source_parts.append(format_source(len(citations), snippet, title, doc_id))
+        
+        logger.debug("Kept %s meaningful citations from %s documents", len(citations), len(docs_with_scores))
+        return citations, "".join(source_parts)
     
-    def _create_snippet(self, text: str, max_length: int = 200) -> str:
+    def _create_snippet(self, text: str, max_length: int = SNIPPET_MAX_CHARS) -> str:
         """
         Create a concise snippet from chunk text.
         
@@ -263,25 +773,7 @@ class RAGPipeline:
         Returns:
             Truncated snippet with ellipsis if needed
         """
-        text = text.strip()
-        if len(text) <= max_length:
-            return text
-        
-        # Try to cut at a sentence boundary
-        truncated = text[:max_length]
-        last_period = truncated.rfind('.')
-        last_space = truncated.rfind(' ')
-        
-        # If we find a period, cut there
-        if last_period > max_length * 0.7:  # Don't cut too early
-            return text[:last_period + 1]
-        
-        # Otherwise cut at last word boundary
-        if last_space > max_length * 0.7:
-            return text[:last_space] + "..."
-        
-        # Fallback: hard cut with ellipsis
-        return text[:max_length - 3] + "..."
+        return create_snippet(text, max_length)
     
     def get_pipeline_status(self) -> Dict[str, Any]:
         """
@@ -315,6 +807,6 @@ class RAGPipeline:
                 if hasattr(collection, 'count'):
                     status["vectorstore"]["document_count"] = collection.count()
         except Exception as e:
-            logger.debug(f"Could not get document count: {e}")
+            logger.debug("Could not get document count: %s", e)
         
         return status
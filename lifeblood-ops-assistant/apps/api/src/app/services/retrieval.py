@@ -3,22 +3,29 @@
 import logging
 import os
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Sequence
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings
 from chromadb.errors import NotFoundError
 
-from ..core.config import settings
+from ..core.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Chunk fields stored as ChromaDB metadata
+_METADATA_KEYS = ('doc_id', 'title', 'start', 'end', 'snippet')
+
+# Records sent per collection.upsert call
+_UPSERT_BATCH_SIZE = 5000
+
 
 class VectorStore(ABC):
     """Abstract interface for vector storage and retrieval."""
     
     @abstractmethod
-    def upsert_chunks(self, chunks: List[Dict[str, Any]], embeddings: List[List[float]]) -> None:
+    def upsert_chunks(self, chunks: List[Dict[str, Any]], embeddings: Sequence[Sequence[float]]) -> None:
         """
         Insert or update chunks with their embeddings.
         
@@ -29,7 +36,7 @@ class VectorStore(ABC):
         pass
     
     @abstractmethod
-    def query(self, query_embedding: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+    def query(self, query_embedding: Sequence[float], top_k: int = 5) -> List[Dict[str, Any]]:
         """
         Query the vector store for similar chunks.
         
@@ -59,7 +66,7 @@ class ChromaVectorStore(VectorStore):
             persist_dir: Directory for persistent storage (defaults to config setting)
         """
         self.collection_name = collection_name
-        self.persist_dir = persist_dir or settings.CHROMA_PERSIST_DIR
+        self.persist_dir = persist_dir or get_settings().CHROMA_PERSIST_DIR
         
         # Ensure persist directory exists
         os.makedirs(self.persist_dir, exist_ok=True)
@@ -87,89 +94,108 @@ class ChromaVectorStore(VectorStore):
         
         logger.info(f"ChromaVectorStore initialized with persist_dir: {self.persist_dir}")
     
-    def upsert_chunks(self, chunks: List[Dict[str, Any]], embeddings: List[List[float]]) -> None:
+    def upsert_chunks(self, chunks: List[Dict[str, Any]], embeddings: Sequence[Sequence[float]]) -> None:
         """
         Insert or update chunks with their embeddings in ChromaDB.
         
         Args:
             chunks: List of chunk dictionaries with doc_id, chunk_id, text, title, etc.
-            embeddings: List of embedding vectors corresponding to chunks
+            embeddings: Embedding vectors corresponding to chunks (list or float32 array)
         """
-        if not chunks or not embeddings:
+        # len() rather than truthiness: embeddings may be a NumPy array
+        if not chunks or len(embeddings) == 0:
             logger.warning("No chunks or embeddings provided for upsert")
             return
         
         if len(chunks) != len(embeddings):
             raise ValueError(f"Chunks count ({len(chunks)}) must match embeddings count ({len(embeddings)})")
         
-        # Prepare data for ChromaDB
-        ids = []
-        documents = []
-        metadatas = []
+        # Hand Chroma one contiguous float32 matrix (no copy when it already is
+        # one) so it doesn't walk and unbox nested Python lists per sub-batch
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        
+        # Prepare data for ChromaDB, filling preallocated lists by index
+        n = len(chunks)
+        ids = [None] * n
+        documents = [None] * n
+        metadatas = [None] * n
         
-        for chunk, embedding in zip(chunks, embeddings):
+        for i, chunk in enumerate(chunks):
             # Use chunk_id as the unique identifier
             chunk_id = chunk.get('chunk_id')
             if not chunk_id:
                 raise ValueError(f"Chunk missing required 'chunk_id' field: {chunk}")
             
-            ids.append(chunk_id)
-            documents.append(chunk.get('text', ''))
+            ids[i] = chunk_id
+            documents[i] = chunk.get('text', '')
             
-            # Store relevant metadata (ChromaDB will automatically filter out None values)
-            metadata = {
-                'doc_id': chunk.get('doc_id'),
-                'title': chunk.get('title'),
-                'start': chunk.get('start'),
-                'end': chunk.get('end')
-            }
-            # Remove None values
-            metadata = {k: v for k, v in metadata.items() if v is not None}
-            metadatas.append(metadata)
+            # Store relevant metadata, skipping None values (ChromaDB rejects them)
+            metadata = {}
+            for key in _METADATA_KEYS:
+                value = chunk.get(key)
+                if value is not None:
+                    metadata[key] = value
+            metadatas[i] = metadata
         
         try:
             # Upsert to ChromaDB (will update if exists, insert if new)
-            self.collection.upsert(
-                ids=ids,
-                embeddings=embeddings,
-                documents=documents,
-                metadatas=metadatas
-            )
-            
-            logger.info(f"Successfully upserted {len(chunks)} chunks to ChromaDB")
-            
+            self._upsert_in_batches(ids, embeddings, documents, metadatas)
         except Exception as e:
-            # Check if it's a dimension mismatch error
-            if "dimension" in str(e).lower():
-                logger.warning(f"Embedding dimension mismatch detected: {e}")
-                logger.info("Resetting collection for new embedding dimension...")
-                
-                # Delete and recreate collection with new dimension
-                self.client.delete_collection(name=self.collection_name)
-                self.collection = self.client.create_collection(
-                    name=self.collection_name,
-                    metadata={"description": "Lifeblood operations document chunks"}
-                )
-                logger.info(f"Recreated collection '{self.collection_name}'")
-                
-                # Retry the upsert
-                self.collection.upsert(
-                    ids=ids,
-                    embeddings=embeddings,
-                    documents=documents,
-                    metadatas=metadatas
-                )
-                
-                logger.info(f"Successfully upserted {len(chunks)} chunks to new ChromaDB collection")
-            else:
-                # Re-raise if it's not a dimension error
+            # Only a dimension mismatch is recoverable. Chroma versions report it
+            # with different exception types, so it is recognized by message
+            if "dimension" not in str(e).lower():
+                logger.error(f"Error upserting chunks to ChromaDB: {e}")
                 raise
             
-        except Exception as e:
-            logger.error(f"Error upserting chunks to ChromaDB: {e}")
-            raise
+            logger.warning("Embedding dimension mismatch detected: %s", e)
+            logger.info("Resetting collection for new embedding dimension...")
+            
+            # Delete and recreate collection with new dimension
+            self.client.delete_collection(name=self.collection_name)
+            self.collection = self.client.create_collection(
+                name=self.collection_name,
+                metadata={"description": "Lifeblood operations document chunks"}
+            )
+            logger.info("Recreated collection '%s'", self.collection_name)
+            
+            # Retry the upsert; a failure here is unrelated to the old collection's
+            # dimension, so don't chain it to the mismatch error
+            try:
+                self._upsert_in_batches(ids, embeddings, documents, metadatas)
+            except Exception as retry_error:
+                logger.error(f"Error upserting chunks to new ChromaDB collection: {retry_error}")
+                raise retry_error from None
+            
+            logger.info("Successfully upserted %d chunks to new ChromaDB collection", len(chunks))
+            return
+        
+        logger.info("Successfully upserted %d chunks to ChromaDB", len(chunks))
+    
+    def _upsert_in_batches(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Upsert prepared records in sub-batches of at most _UPSERT_BATCH_SIZE.
+        
+        Each collection.upsert call commits its own SQLite transaction, so
+        large sub-batches amortize that cost while staying under the client's
+        maximum batch size.
+        """
+        batch_size = min(_UPSERT_BATCH_SIZE, self.client.get_max_batch_size())
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            self.collection.upsert(
+                ids=ids[start:end],
+                embeddings=embeddings[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end]
+            )
     
-    def query(self, query_embedding: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+    def query(self, query_embedding: Sequence[float], top_k: int = 5) -> List[Dict[str, Any]]:
         """
         Query ChromaDB for similar chunks.
         
@@ -180,29 +206,30 @@ class ChromaVectorStore(VectorStore):
         Returns:
             List of similar chunks with metadata and similarity scores
         """
-        if not query_embedding:
+        if query_embedding is None or len(query_embedding) == 0:
             logger.warning("Empty query embedding provided")
             return []
         
         # Check if collection has any documents
         try:
             collection_count = self.collection.count()
-            logger.debug(f"Collection '{self.collection_name}' has {collection_count} documents")
+            logger.debug("Collection '%s' has %d documents", self.collection_name, collection_count)
             if collection_count == 0:
                 logger.warning("Collection is empty - no documents to search")
                 return []
         except Exception as e:
-            logger.warning(f"Could not get collection count: {e}")
+            logger.warning("Could not get collection count: %s", e)
         
         try:
             # Query ChromaDB
             results = self.collection.query(
-                query_embeddings=[query_embedding],
+                query_embeddings=np.asarray(query_embedding, dtype=np.float32).reshape(1, -1),
                 n_results=top_k,
                 include=['documents', 'metadatas', 'distances']
             )
             
-            logger.debug(f"ChromaDB raw results: {results}")
+            # Lazy %-args: the nested result lists are only stringified at DEBUG level
+            logger.debug("ChromaDB raw results: %s", results)
             
             # ChromaDB returns nested lists even for single query
             documents = results.get('documents', [[]])[0]
@@ -210,27 +237,30 @@ class ChromaVectorStore(VectorStore):
             distances = results.get('distances', [[]])[0]
             ids = results.get('ids', [[]])[0]
             
-            logger.debug(f"Extracted: {len(documents)} documents, {len(metadatas)} metadatas, {len(distances)} distances, {len(ids)} ids")
+            logger.debug(
+                "Extracted: %d documents, %d metadatas, %d distances, %d ids",
+                len(documents), len(metadatas), len(distances), len(ids)
+            )
+            
+            # Convert distances to similarity scores in one vectorized step
+            # (ChromaDB uses cosine distance: similarity = 1 - distance, clamped to [0, 1])
+            scores = np.clip(1.0 - np.asarray(distances, dtype=np.float64), 0.0, 1.0).tolist()
             
             # Convert to our expected format
-            query_results = []
-            for i, (text, metadata, distance, chunk_id) in enumerate(zip(documents, metadatas, distances, ids)):
-                # Convert distance to similarity score (ChromaDB uses cosine distance)
-                # For cosine distance: similarity = 1 - distance, clamped to [0, 1]
-                score = max(0.0, min(1.0, 1.0 - distance))
-                
-                result = {
-                    'doc_id': metadata.get('doc_id', 'unknown') if metadata else 'unknown',
-                    'title': metadata.get('title') if metadata else None,
-                    'chunk_id': chunk_id,
-                    'text': text,  # In ChromaDB, 'documents' contains the actual text
+            query_results = [None] * len(scores)
+            for i, score in enumerate(scores):
+                metadata = metadatas[i] or {}
+                query_results[i] = {
+                    'doc_id': metadata.get('doc_id', 'unknown'),
+                    'title': metadata.get('title'),
+                    'chunk_id': ids[i],
+                    'text': documents[i],  # In ChromaDB, 'documents' contains the actual text
                     'score': score,
-                    'start': metadata.get('start') if metadata else None,
-                    'end': metadata.get('end') if metadata else None
+                    'start': metadata.get('start'),
+                    'end': metadata.get('end')
                 }
-                query_results.append(result)
             
-            logger.debug(f"Query returned {len(query_results)} results")
+            logger.debug("Query returned %d results", len(query_results))
             return query_results
             
         except Exception as e:
@@ -0,0 +1,120 @@
+"""Semantic answer cache matching near-duplicate questions by embedding similarity."""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCache:
+    """
+    In-memory cache of answers keyed by question embedding.
+    
+    A lookup returns the answer stored for the most cosine-similar question
+    with the same key (e.g. mode and top_k), provided the similarity is at
+    least `threshold` and the entry has not expired. Entries live in a
+    fixed-size ring, so the oldest are evicted first.
+    """
+    
+    def __init__(self, threshold: float = 0.95, max_entries: int = 10000, ttl_seconds: float = 3600.0):
+        """
+        Initialize the cache.
+        
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Maximum number of cached answers
+            ttl_seconds: Seconds an answer stays valid (0 keeps it until evicted)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        
+        # Unit-normalized question embeddings, allocated once the dimension is known
+        self._vectors: Optional[np.ndarray] = None
+        self._key_ids = np.zeros(max_entries, dtype=np.int32)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._values: list = []
+        self._key_index: Dict[Hashable, int] = {}
+        self._next_slot = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+        """Return the unit vector, or None if it can't be compared."""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        if norm == 0.0:
+            return None
+        return array / norm
+    
+    def lookup(self, vector: Sequence[float], key: Hashable) -> Optional[Any]:
+        """
+        Find the answer for the most similar cached question with the same key.
+        
+        Args:
+            vector: Question embedding
+            key: Extra parameters the answer depends on
+            
+        Returns:
+            Cached value, or None on a miss
+        """
+        unit = self._normalize(vector)
+        if unit is None:
+            return None
+        
+        with self._lock:
+            key_id = self._key_index.get(key)
+            count = len(self._values)
+            if key_id is None or count == 0 or self._vectors.shape[1] != unit.shape[0]:
+                return None
+            
+            similarities = self._vectors[:count] @ unit
+            candidates = self._key_ids[:count] == key_id
+            if self.ttl_seconds > 0:
+                candidates &= self._expires[:count] > time.monotonic()
+            similarities[~candidates] = -np.inf
+            
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                logger.debug("Semantic answer cache hit (similarity %.3f)", similarities[best])
+                return self._values[best]
+        return None
+    
+    def store(self, vector: Sequence[float], key: Hashable, value: Any) -> None:
+        """
+        Add an answer, evicting the oldest entry when full.
+        
+        Args:
+            vector: Question embedding
+            key: Extra parameters the answer depends on
+            value: Value to return for similar questions
+        """
+        unit = self._normalize(vector)
+        if unit is None:
+            return
+        
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != unit.shape[0]:
+                self._vectors = np.empty((self.max_entries, unit.shape[0]), dtype=np.float32)
+                self._values = []
+                self._next_slot = 0
+            
+            slot = self._next_slot
+            self._vectors[slot] = unit
+            self._key_ids[slot] = self._key_index.setdefault(key, len(self._key_index))
+            self._expires[slot] = time.monotonic() + self.ttl_seconds
+            if len(self._values) < self.max_entries:
+                self._values.append(value)
+            else:
+                self._values[slot] = value
+            self._next_slot = (slot + 1) % self.max_entries
+    
+    def clear(self) -> None:
+        """Drop all cached answers."""
+        with self._lock:
+            self._values = []
+            self._next_slot = 0
@@ -0,0 +1,105 @@
+"""Persistent key/value byte store backed by SQLite."""
+
+import os
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+
+class SQLiteByteStore(MutableMapping):
+    """
+    Thread-safe MutableMapping[str, bytes] persisted to a single SQLite file.
+    
+    Supports batched mget/mset so callers can read or write many keys in one
+    statement instead of one round-trip per key.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (or create) the store.
+        
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+    
+    def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """
+        Get values for many keys at once.
+        
+        Args:
+            keys: Keys to look up
+            
+        Returns:
+            Values in the same order as keys, None for missing keys
+        """
+        if not keys:
+            return []
+        
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            batch = list(keys[start:start + 500])
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM kv WHERE key IN ({placeholders})", batch
+                ).fetchall()
+            found.update(rows)
+        
+        return [found.get(key) for key in keys]
+    
+    def mset(self, items: Sequence[Tuple[str, bytes]]) -> None:
+        """
+        Set many key/value pairs in one transaction.
+        
+        Args:
+            items: (key, value) pairs to store
+        """
+        if not items:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", items
+            )
+    
+    def __getitem__(self, key: str) -> bytes:
+        value = self.mget([key])[0]
+        if value is None:
+            raise KeyError(key)
+        return value
+    
+    def __setitem__(self, key: str, value: bytes) -> None:
+        self.mset([(key, value)])
+    
+    def __delitem__(self, key: str) -> None:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            keys = [row[0] for row in self._conn.execute("SELECT key FROM kv")]
+        return iter(keys)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0]
+    
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
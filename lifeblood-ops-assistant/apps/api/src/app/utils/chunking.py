@@ -2,6 +2,61 @@
 
 from typing import Dict, List
 
+# Length of the citation snippet stored with each chunk
+SNIPPET_MAX_CHARS = 200
+
+
+def create_snippet(text: str, max_length: int = SNIPPET_MAX_CHARS) -> str:
+    """
+    Create a concise snippet from chunk text.
+    
+    Args:
+        text: Full chunk text
+        max_length: Maximum snippet length
+        
+    Returns:
+        Truncated snippet with ellipsis if needed
+    """
+    # Chunks are usually much longer than the snippet, so strip a window
+    # from the front instead of copying the whole text; fall back to a full
+    # strip when whitespace could make the stripped text fit in max_length
+    head = text[:max_length + 64].lstrip()
+    if len(head) <= max_length or head[max_length:].isspace():
+        head = text.strip()
+        if len(head) <= max_length:
+            return head
+    
+    # Only boundaries past 70% of max_length are used, so don't search
+    # before it; searching head in place avoids slicing out the first
+    # max_length characters just to scan them
+    min_cut = int(max_length * 0.7) + 1
+    
+    # Try to cut at a sentence boundary
+    last_period = head.rfind('.', min_cut, max_length)
+    if last_period != -1:
+        return head[:last_period + 1]
+    
+    # Otherwise cut at last word boundary
+    last_space = head.rfind(' ', min_cut, max_length)
+    if last_space != -1:
+        return head[:last_space] + "..."
+    
+    # Fallback: hard cut with ellipsis
+    return head[:max_length - 3] + "..."
+
+
+def _single_chunk(doc_id: str, title: str, text: str) -> Dict[str, str]:
+    """Build the chunk dict for a document that fits in one chunk."""
+    return {
+        'doc_id': doc_id,
+        'chunk_id': f"{doc_id}_chunk_0",
+        'start': 0,
+        'end': len(text),
+        'text': text,
+        'title': title,
+        'snippet': create_snippet(text)
+    }
+
 
 def chunk_document(
     document: Dict[str, str], 
@@ -18,6 +73,7 @@ def chunk_document(
         
     Returns:
         List of chunk dicts with 'doc_id', 'chunk_id', 'start', 'end', 'text', 'title'
+        and 'snippet' (the citation snippet, computed once here instead of per query)
     """
     text = document['text']
     doc_id = document['doc_id']
@@ -31,15 +87,7 @@ def chunk_document(
     
     # If document is smaller than chunk size, return as single chunk
     if text_length <= chunk_size_chars:
-        chunks.append({
-            'doc_id': doc_id,
-            'chunk_id': f"{doc_id}_chunk_0",
-            'start': 0,
-            'end': text_length,
-            'text': text,
-            'title': title
-        })
-        return chunks
+        return [_single_chunk(doc_id, title, text)]
     
     # Calculate step size (chunk size - overlap)
     step_size = chunk_size_chars - overlap_chars
@@ -65,7 +113,8 @@ def chunk_document(
                 'start': start,
                 'end': end,
                 'text': chunk_text,
-                'title': title
+                'title': title,
+                'snippet': create_snippet(chunk_text)
             })
             chunk_index += 1
         
@@ -98,6 +147,15 @@ def chunk_documents(
     all_chunks = []
     
     for document in documents:
+        text = document['text']
+        
+        # Short documents (FAQs, brief policies) are the common case and become
+        # a single chunk, so build it directly rather than calling chunk_document
+        if len(text) <= chunk_size_chars:
+            if text.strip():
+                all_chunks.append(_single_chunk(document['doc_id'], document['title'], text))
+            continue
+        
         doc_chunks = chunk_document(
             document=document,
             chunk_size_chars=chunk_size_chars,
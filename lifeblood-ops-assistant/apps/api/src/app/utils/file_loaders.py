@@ -1,17 +1,34 @@
 """File loading utilities for processing documents."""
 
+import logging
 import os
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
+
+import anyio
+
+logger = logging.getLogger(__name__)
+
+# Supported file extensions
+SUPPORTED_EXTENSIONS = {'.txt', '.md'}
+
+# path -> (st_mtime_ns, st_size, document or None for an empty file); lets
+# periodic re-ingests skip reading files that have not changed
+_document_cache: Dict[str, Tuple[int, int, Optional[Dict[str, str]]]] = {}
+_document_cache_lock = threading.Lock()
+
+# Five levels up from this file (utils -> app -> src -> api -> root); resolved
+# once at import instead of on every ingest. In the API image this is /app
+_PROJECT_ROOT = Path(__file__).resolve().parents[4]
 
 
 def extract_title_from_content(text: str, fallback_title: str) -> str:
     """Extract title from document content, fallback to provided title."""
-    lines = text.strip().split('\n')
-    if not lines:
-        return fallback_title
-    
-    first_line = lines[0].strip()
+    # Only the first line is needed, so find its end instead of splitting every line
+    text = text.lstrip()
+    newline = text.find('\n')
+    first_line = (text[:newline] if newline >= 0 else text).strip()
     
     # Check if first line is a markdown header
     if first_line.startswith('# '):
@@ -24,94 +41,201 @@ def extract_title_from_content(text: str, fallback_title: str) -> str:
     return fallback_title
 
 
-def load_document_file(file_path: Path) -> Optional[Dict[str, str]]:
-    """Load a single document file and extract metadata."""
+def load_document_file(file_path: Union[str, Path]) -> Optional[Dict[str, str]]:
+    """
+    Load a single document file and extract metadata.
+    
+    Results are cached by path, modification time and size, so files left
+    unchanged since the last load are not read again.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            text = f.read().strip()
+        key = os.fspath(file_path)
+        stat = os.stat(key)
+        with _document_cache_lock:
+            cached = _document_cache.get(key)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            # Copy so callers can't modify the cached document
+            return dict(cached[2]) if cached[2] is not None else None
         
-        if not text:
-            return None
-            
-        # Generate doc_id from filename (without extension)
-        doc_id = file_path.stem
-        
-        # Generate fallback title from filename
-        fallback_title = file_path.stem.replace('_', ' ').replace('-', ' ').title()
-        
-        # Extract title from content
-        title = extract_title_from_content(text, fallback_title)
-        
-        return {
-            'doc_id': doc_id,
-            'title': title,
-            'text': text
-        }
+        doc = _read_document_file(key)
+        with _document_cache_lock:
+            _document_cache[key] = (stat.st_mtime_ns, stat.st_size, doc)
+        return dict(doc) if doc is not None else None
         
     except Exception as e:
-        print(f"Error loading file {file_path}: {e}")
+        logger.error("Error loading file %s: %s", file_path, e)
         return None
 
 
-def load_documents_from_directory(docs_dir: str = "data/docs") -> List[Dict[str, str]]:
-    """Load all .txt and .md files from the specified directory."""
-    # Convert relative path to absolute path from project root
-    if not os.path.isabs(docs_dir):
-        # Try multiple path resolution strategies
-        current_file = Path(__file__)
-        
-        # Strategy 1: Go up from current file to project root (utils -> app -> src -> api -> apps -> project)
-        project_root = current_file.parent.parent.parent.parent.parent
-        docs_path = project_root / docs_dir
-        
-        # Strategy 2: If that doesn't work, try from current working directory
-        if not docs_path.exists():
-            docs_path = Path.cwd() / docs_dir
+def _read_document_file(file_path: str) -> Optional[Dict[str, str]]:
+    """Read a document file and extract its metadata, or None if it is empty."""
+    # Unbuffered binary read: FileIO.readall sizes one read from fstat,
+    # skipping the BufferedReader/TextIOWrapper layers of text mode
+    with open(file_path, 'rb', buffering=0) as f:
+        text = f.read().decode('utf-8')
+    
+    # Keep text mode's universal newline translation
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    text = text.strip()
+    
+    if not text:
+        return None
         
-        # Strategy 3: Try hardcoded path as last resort
-        if not docs_path.exists():
-            hardcoded_path = Path("E:/Personal Projects/lifeblood/lifeblood-ops-assistant") / docs_dir
-            if hardcoded_path.exists():
-                docs_path = hardcoded_path
-    else:
+    # Generate doc_id from filename (without extension); os.path works on the
+    # scanner's plain string paths without building a Path per file
+    doc_id = os.path.splitext(os.path.basename(file_path))[0]
+    
+    # Generate fallback title from filename
+    fallback_title = doc_id.replace('_', ' ').replace('-', ' ').title()
+    
+    # Extract title from content
+    title = extract_title_from_content(text, fallback_title)
+    
+    return {
+        'doc_id': doc_id,
+        'title': title,
+        'text': text
+    }
+
+
+def _prune_document_cache(seen_paths: List[str]) -> None:
+    """Drop cached documents for files that were not found by the latest scan."""
+    seen = set(seen_paths)
+    with _document_cache_lock:
+        for path in [path for path in _document_cache if path not in seen]:
+            del _document_cache[path]
+
+
+def _resolve_docs_path(docs_dir: str) -> Optional[Path]:
+    """Resolve the documents directory, returning None if it cannot be found."""
+    # Relative paths are taken from the project root, then the working directory
+    if os.path.isabs(docs_dir):
         docs_path = Path(docs_dir)
+    else:
+        docs_path = _PROJECT_ROOT / docs_dir
+        if not docs_path.is_dir():
+            docs_path = Path.cwd() / docs_dir
     
-    documents = []
+    logger.debug("Looking for documents in: %s", docs_path)
     
-    print(f"Debug - Looking for documents in: {docs_path}")
-    print(f"Debug - Path exists: {docs_path.exists()}")
-    
-    if not docs_path.exists():
-        print(f"Directory not found: {docs_path}")
-        # Try alternative path resolution in case we're running from different directory
-        alternative_path = Path.cwd() / docs_dir
-        print(f"Debug - Trying alternative path: {alternative_path}")
-        if alternative_path.exists():
-            docs_path = alternative_path
-            print(f"Debug - Using alternative path: {docs_path}")
-        else:
-            print(f"Debug - Alternative path also doesn't exist")
-            return documents
+    if not docs_path.is_dir():
+        logger.warning("Directory not found: %s", docs_path)
+        return None
     
-    # Supported file extensions
-    supported_extensions = {'.txt', '.md'}
+    return docs_path
+
+
+def _scan_directory(dir_path: str) -> Tuple[List[str], List[str]]:
+    """List one directory with os.scandir, returning (subdirectories, supported files)."""
+    subdirs = []
+    supported_files = []
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            # Don't follow directory symlinks, matching Path.rglob
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS:
+                supported_files.append(entry.path)
+    return subdirs, supported_files
+
+
+def _scan_supported_files(docs_path: Path) -> List[str]:
+    """Recursively collect supported file paths under docs_path using os.scandir."""
+    supported_files = []
+    pending_dirs = [os.fspath(docs_path)]
     
-    # Load all supported files
-    print(f"Debug - Scanning directory for files...")
-    all_files = list(docs_path.rglob('*'))
-    print(f"Debug - Found {len(all_files)} total files/directories")
+    while pending_dirs:
+        subdirs, files = _scan_directory(pending_dirs.pop())
+        pending_dirs.extend(subdirs)
+        supported_files.extend(files)
     
-    supported_files = [f for f in all_files if f.is_file() and f.suffix.lower() in supported_extensions]
-    print(f"Debug - Found {len(supported_files)} supported files: {[f.name for f in supported_files]}")
+    return supported_files
+
+
+def load_documents_from_directory(docs_dir: str = "data/docs") -> List[Dict[str, str]]:
+    """
+    Load all .txt and .md files from the specified directory.
+    
+    The ingest route uses aload_documents_from_directory; this synchronous
+    variant reads files one at a time.
+    
+    Args:
+        docs_dir: Directory to load documents from
+        
+    Returns:
+        List of document dicts in directory scan order
+    """
+    documents = []
+    
+    docs_path = _resolve_docs_path(docs_dir)
+    if docs_path is None:
+        return documents
+    
+    # Load all supported files
+    logger.debug("Scanning directory for files...")
+    supported_files = _scan_supported_files(docs_path)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Found %d supported files: %s",
+            len(supported_files), [os.path.basename(f) for f in supported_files]
+        )
+    _prune_document_cache(supported_files)
     
     for file_path in supported_files:
-        print(f"Debug - Processing file: {file_path}")
         doc = load_document_file(file_path)
         if doc:
-            print(f"Debug - Successfully loaded: {doc['doc_id']}")
+            logger.debug("Successfully loaded: %s", doc['doc_id'])
             documents.append(doc)
         else:
-            print(f"Debug - Failed to load: {file_path}")
+            logger.debug("Failed to load: %s", file_path)
+    
+    logger.debug("Final document count: %d", len(documents))
+    return documents
+
+
+async def aload_documents_from_directory(
+    docs_dir: str = "data/docs",
+    max_concurrency: int = 32
+) -> List[Dict[str, str]]:
+    """
+    Load all .txt and .md files from the specified directory concurrently.
+    
+    Files are read in worker threads so the event loop is never blocked on disk I/O.
+    Each directory's files start loading as soon as it has been listed, so
+    reads overlap the rest of the directory walk.
+    
+    Args:
+        docs_dir: Directory to load documents from
+        max_concurrency: Maximum number of files read at once (bounds open file descriptors)
+        
+    Returns:
+        List of document dicts in directory scan order
+    """
+    docs_path = await anyio.to_thread.run_sync(_resolve_docs_path, docs_dir)
+    if docs_path is None:
+        return []
+    
+    limiter = anyio.CapacityLimiter(max_concurrency)
+    results: List[Optional[Dict[str, str]]] = []
+    
+    async def load_one(index: int, file_path: str) -> None:
+        results[index] = await anyio.to_thread.run_sync(load_document_file, file_path, limiter=limiter)
+    
+    seen_paths = []
+    async with anyio.create_task_group() as tg:
+        # Same depth-first order as _scan_supported_files
+        pending_dirs = [os.fspath(docs_path)]
+        while pending_dirs:
+            subdirs, files = await anyio.to_thread.run_sync(_scan_directory, pending_dirs.pop())
+            pending_dirs.extend(subdirs)
+            for file_path in files:
+                seen_paths.append(file_path)
+                results.append(None)
+                tg.start_soon(load_one, len(results) - 1, file_path)
+        logger.debug("Found %d supported files", len(results))
+    _prune_document_cache(seen_paths)
     
-    print(f"Debug - Final document count: {len(documents)}")
+    documents = [doc for doc in results if doc]
+    logger.debug("Final document count: %d", len(documents))
     return documents
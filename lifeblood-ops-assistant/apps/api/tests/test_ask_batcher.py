@@ -0,0 +1,115 @@
+"""Tests for micro-batching concurrent ask requests."""
+
+import asyncio
+import threading
+
+from app.services.ask_batcher import AskBatcher
+
+
+class RecordingPipeline:
+    """Pipeline stub recording each ask_batch call."""
+    
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+    
+    def ask_batch(self, requests, on_result=None):
+        self.batches.append(list(requests))
+        if self.fail:
+            raise RuntimeError("pipeline down")
+        return [{"answer": f"{question}|{mode}|{top_k}", "citations": []} for question, mode, top_k in requests]
+    
+    async def ask_async(self, question, mode, top_k):
+        self.batches.append("async")
+        return {"answer": f"{question}|{mode}|{top_k}", "citations": []}
+
+
+class SlowTailPipeline:
+    """Pipeline stub that reports the first answer early and finishes the rest later."""
+    
+    def __init__(self):
+        self.release = threading.Event()
+    
+    def ask_batch(self, requests, on_result=None):
+        results = [{"answer": question, "citations": []} for question, _, _ in requests]
+        on_result(0, results[0])
+        self.release.wait(5)
+        return results
+
+
+def run_concurrently(batcher, requests):
+    """Submit all requests at once and close the batcher afterwards."""
+    async def main():
+        try:
+            return await asyncio.gather(
+                *(batcher.ask(question, mode, top_k) for question, mode, top_k in requests),
+                return_exceptions=True
+            )
+        finally:
+            await batcher.aclose()
+    return asyncio.run(main())
+
+
+class TestAskBatcher:
+    """Test cases for AskBatcher."""
+    
+    def test_concurrent_questions_share_a_batch(self):
+        """Test questions submitted together are answered in one batch, in order."""
+        pipeline = RecordingPipeline()
+        requests = [("q1", "general", 5), ("q2", "checklist", 3), ("q3", "general", 1)]
+        
+        results = run_concurrently(AskBatcher(pipeline, max_batch_size=8), requests)
+        
+        assert pipeline.batches == [requests]
+        assert [r["answer"] for r in results] == ["q1|general|5", "q2|checklist|3", "q3|general|1"]
+    
+    def test_batches_respect_max_size(self):
+        """Test more questions than max_batch_size are split across batches."""
+        pipeline = RecordingPipeline()
+        requests = [(f"q{i}", "general", 5) for i in range(5)]
+        
+        results = run_concurrently(AskBatcher(pipeline, max_batch_size=2), requests)
+        
+        assert [len(batch) for batch in pipeline.batches] == [2, 2, 1]
+        assert [r["answer"].split("|")[0] for r in results] == [f"q{i}" for i in range(5)]
+    
+    def test_early_results_resolve_before_batch_finishes(self):
+        """Test a caller is answered as soon as its result is reported."""
+        pipeline = SlowTailPipeline()
+        batcher = AskBatcher(pipeline)
+        
+        async def main():
+            first = asyncio.create_task(batcher.ask("q1"))
+            second = asyncio.create_task(batcher.ask("q2"))
+            try:
+                done, _ = await asyncio.wait({first, second}, timeout=2, return_when=asyncio.FIRST_COMPLETED)
+                assert done == {first}
+                assert not second.done()
+            finally:
+                pipeline.release.set()
+            assert (await second)["answer"] == "q2"
+            await batcher.aclose()
+            return first.result()
+        
+        assert asyncio.run(main())["answer"] == "q1"
+    
+    def test_pipeline_error_propagates_to_callers(self):
+        """Test an exception from ask_batch is raised for every question in the batch."""
+        results = run_concurrently(
+            AskBatcher(RecordingPipeline(fail=True)), [("q1", "general", 5), ("q2", "general", 5)]
+        )
+        
+        assert all(isinstance(r, RuntimeError) for r in results)
+    
+    def test_batch_size_one_uses_async_path(self):
+        """Test max_batch_size=1 answers each question with ask_async."""
+        pipeline = RecordingPipeline()
+        
+        results = run_concurrently(AskBatcher(pipeline, max_batch_size=1), [("q1", "general", 5), ("q2", "general", 2)])
+        
+        assert pipeline.batches == ["async", "async"]
+        assert [r["answer"] for r in results] == ["q1|general|5", "q2|general|2"]
+    
+    def test_aclose_without_use(self):
+        """Test closing a batcher that never started a worker."""
+        asyncio.run(AskBatcher(RecordingPipeline()).aclose())
@@ -0,0 +1,56 @@
+"""Tests for the SQLite byte store."""
+
+import os
+import tempfile
+
+import pytest
+from app.utils.byte_store import SQLiteByteStore
+
+
+class TestSQLiteByteStore:
+    """Test cases for SQLiteByteStore."""
+    
+    def setup_method(self):
+        """Create a store in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "cache", "store.sqlite")
+        self.store = SQLiteByteStore(self.path)
+    
+    def teardown_method(self):
+        """Close the store and remove the temporary directory."""
+        self.store.close()
+        self.temp_dir.cleanup()
+    
+    def test_set_and_get(self):
+        """Test a stored value can be read back."""
+        self.store["key"] = b"value"
+        assert self.store["key"] == b"value"
+        assert len(self.store) == 1
+    
+    def test_missing_key_raises(self):
+        """Test reading a missing key raises KeyError."""
+        with pytest.raises(KeyError):
+            self.store["missing"]
+        assert self.store.get("missing") is None
+    
+    def test_mget_preserves_order(self):
+        """Test mget returns values in key order with None for misses."""
+        self.store.mset([("a", b"1"), ("c", b"3")])
+        assert self.store.mget(["c", "b", "a"]) == [b"3", None, b"1"]
+    
+    def test_delete(self):
+        """Test deleting keys."""
+        self.store["key"] = b"value"
+        del self.store["key"]
+        assert "key" not in self.store
+        with pytest.raises(KeyError):
+            del self.store["key"]
+    
+    def test_persists_across_instances(self):
+        """Test values survive reopening the store."""
+        self.store["key"] = b"value"
+        self.store.close()
+        
+        self.store = SQLiteByteStore(self.path)
+        assert self.store["key"] == b"value"
+        assert list(self.store) == ["key"]
@@ -0,0 +1,57 @@
+"""Tests pinning the batched Chroma search adapter to langchain_chroma's own search."""
+
+import uuid
+
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.services.chroma_search import search_by_vectors
+
+
+TEXTS = [
+    "Blood donors must be between 17 and 65 years old.",
+    "Donors must weigh at least 110 pounds.",
+    "Plasma must be frozen within eight hours of collection.",
+    "Escalate adverse donor reactions to the shift supervisor.",
+    "Iron levels are checked before every whole blood donation.",
+]
+
+
+@pytest.fixture(params=[None, {"hnsw:space": "cosine"}], ids=["default", "cosine"])
+def vectorstore(request):
+    """In-memory Chroma store holding TEXTS, with the default and cosine distance metrics."""
+    store = Chroma(
+        collection_name=f"test_{uuid.uuid4().hex}",
+        embedding_function=DeterministicFakeEmbedding(size=16),
+        collection_metadata=request.param
+    )
+    store.add_texts(TEXTS, metadatas=[{"doc_id": f"doc{i}"} for i in range(len(TEXTS))])
+    yield store
+    store.delete_collection()
+
+
+class TestSearchByVectors:
+    """Test cases for search_by_vectors."""
+    
+    def test_matches_similarity_search_with_relevance_scores(self, vectorstore):
+        """Test batched results equal langchain_chroma's per-query relevance search."""
+        queries = ["How old must donors be?", "When is plasma frozen?"]
+        vectors = vectorstore.embeddings.embed_documents(queries)
+        
+        batched = search_by_vectors(vectorstore, vectors, [3, 3])
+        
+        for query, results in zip(queries, batched):
+            expected = vectorstore.similarity_search_with_relevance_scores(query, k=3)
+            assert [(doc.page_content, doc.metadata, doc.id) for doc, _ in results] == [
+                (doc.page_content, doc.metadata, doc.id) for doc, _ in expected
+            ]
+            assert [score for _, score in results] == pytest.approx([score for _, score in expected])
+    
+    def test_rows_cut_to_their_own_top_k(self, vectorstore):
+        """Test each vector gets at most its own top_k results from the shared query."""
+        vectors = vectorstore.embeddings.embed_documents(["first", "second"])
+        
+        batched = search_by_vectors(vectorstore, vectors, [1, 4])
+        
+        assert [len(results) for results in batched] == [1, 4]
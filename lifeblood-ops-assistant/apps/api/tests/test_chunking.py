@@ -1,7 +1,7 @@
 """Tests for document chunking utilities."""
 
 import pytest
-from app.utils.chunking import chunk_document, chunk_documents, get_chunk_overlap
+from app.utils.chunking import chunk_document, chunk_documents, create_snippet, get_chunk_overlap
 
 
 class TestChunkDocument:
@@ -125,6 +125,16 @@ class TestChunkDocument:
         
         for chunk in large_chunks:
             assert len(chunk['text']) <= 500
+    
+    def test_chunks_carry_snippets(self):
+        """Test every chunk stores the citation snippet of its own text."""
+        text = "Donors must be healthy. " * 100
+        document = {'doc_id': 'snip', 'title': 'Snippets', 'text': text}
+        chunks = chunk_document(document, chunk_size_chars=500, overlap_chars=50)
+        
+        for chunk in chunks:
+            assert chunk['snippet'] == create_snippet(chunk['text'])
+            assert len(chunk['snippet']) <= 200
 
 
 class TestChunkDocuments:
@@ -179,6 +189,20 @@ class TestChunkDocuments:
         # Huge document should produce multiple chunks
         huge_chunks = [c for c in chunks if c['doc_id'] == 'huge']
         assert len(huge_chunks) > 1
+    
+    def test_matches_chunk_document(self):
+        """Test the inline single-chunk path builds the same chunks as chunk_document."""
+        docs = [
+            {'doc_id': 'short', 'title': 'Short', 'text': '  Short policy text.  '},
+            {'doc_id': 'blank', 'title': 'Blank', 'text': '   \n  '},
+            {'doc_id': 'exact', 'title': 'Exact', 'text': 'E' * 100},
+            {'doc_id': 'long', 'title': 'Long', 'text': 'Long text. ' * 50}
+        ]
+        
+        chunks = chunk_documents(docs, chunk_size_chars=100, overlap_chars=20)
+        
+        expected = [c for doc in docs for c in chunk_document(doc, chunk_size_chars=100, overlap_chars=20)]
+        assert chunks == expected
 
 
 class TestGetChunkOverlap:
@@ -1,14 +1,46 @@
 """Tests for embedding providers."""
 
+import numpy as np
 import pytest
 from app.services.embeddings import (
+    CachedEmbeddingsProvider,
     EmbeddingsProvider, 
     FakeEmbeddingsProvider, 
     GeminiEmbeddingsProvider,
-    get_embeddings_provider
+    dequantize_int8,
+    get_embeddings_provider,
+    int8_cosine_similarity,
+    quantize_int8
 )
 
 
+@pytest.fixture(scope="module")
+def fake_provider():
+    """Default-dimension fake provider shared by the tests in this module.
+    
+    FakeEmbeddingsProvider holds no per-call state, so one instance can serve
+    every test that doesn't exercise construction or a specific dimension.
+    """
+    return FakeEmbeddingsProvider()
+
+
+class CountingEmbeddingsProvider(FakeEmbeddingsProvider):
+    """Fake provider that records which texts reach it."""
+    
+    def __init__(self, embedding_dim: int = 16):
+        super().__init__(embedding_dim=embedding_dim)
+        self.embedded_texts = []
+        self.embedded_queries = []
+    
+    def embed_texts(self, texts):
+        self.embedded_texts.extend(texts)
+        return super().embed_texts(texts)
+    
+    def embed_query(self, text):
+        self.embedded_queries.append(text)
+        return super().embed_query(text)
+
+
 class TestFakeEmbeddingsProvider:
     """Test cases for FakeEmbeddingsProvider."""
     
@@ -28,45 +60,37 @@ class TestFakeEmbeddingsProvider:
         
         embedding = provider.embed_query("test text")
         
-        assert isinstance(embedding, list)
+        assert isinstance(embedding, np.ndarray)
         assert len(embedding) == 100
-        assert all(isinstance(val, float) for val in embedding)
+        assert embedding.dtype == np.float32
     
-    def test_embed_query_deterministic(self):
+    def test_embed_query_deterministic(self, fake_provider):
         """Test embed_query produces deterministic results."""
-        provider = FakeEmbeddingsProvider()
-        
         text = "This is a test query"
-        embedding1 = provider.embed_query(text)
-        embedding2 = provider.embed_query(text)
+        embedding1 = fake_provider.embed_query(text)
+        embedding2 = fake_provider.embed_query(text)
         
-        assert embedding1 == embedding2
+        assert np.array_equal(embedding1, embedding2)
     
-    def test_embed_query_different_texts_different_embeddings(self):
+    def test_embed_query_different_texts_different_embeddings(self, fake_provider):
         """Test different texts produce different embeddings."""
-        provider = FakeEmbeddingsProvider()
-        
-        embedding1 = provider.embed_query("First text")
-        embedding2 = provider.embed_query("Second text")
+        embedding1 = fake_provider.embed_query("First text")
+        embedding2 = fake_provider.embed_query("Second text")
         
-        assert embedding1 != embedding2
+        assert not np.array_equal(embedding1, embedding2)
     
-    def test_embed_query_values_in_range(self):
+    def test_embed_query_values_in_range(self, fake_provider):
         """Test embedding values are in expected range [-1, 1]."""
-        provider = FakeEmbeddingsProvider()
-        
-        embedding = provider.embed_query("test")
+        embedding = fake_provider.embed_query("test")
         
         for value in embedding:
             assert -1.0 <= value <= 1.0
     
-    def test_embed_texts_empty_list(self):
-        """Test embed_texts with empty list returns empty list."""
-        provider = FakeEmbeddingsProvider()
+    def test_embed_texts_empty_list(self, fake_provider):
+        """Test embed_texts with empty list returns an empty matrix."""
+        embeddings = fake_provider.embed_texts([])
         
-        embeddings = provider.embed_texts([])
-        
-        assert embeddings == []
+        assert embeddings.shape == (0, fake_provider.embedding_dim)
     
     def test_embed_texts_single_text(self):
         """Test embed_texts with single text."""
@@ -76,42 +100,36 @@ class TestFakeEmbeddingsProvider:
         
         assert len(embeddings) == 1
         assert len(embeddings[0]) == 50
-        assert all(isinstance(val, float) for val in embeddings[0])
+        assert embeddings[0].dtype == np.float32
     
-    def test_embed_texts_multiple_texts(self):
+    def test_embed_texts_multiple_texts(self, fake_provider):
         """Test embed_texts with multiple texts."""
-        provider = FakeEmbeddingsProvider()
-        
         texts = ["First text", "Second text", "Third text"]
-        embeddings = provider.embed_texts(texts)
+        embeddings = fake_provider.embed_texts(texts)
         
         assert len(embeddings) == 3
         assert all(len(emb) == 384 for emb in embeddings)
         
         # Each embedding should be different
-        assert embeddings[0] != embeddings[1]
-        assert embeddings[1] != embeddings[2]
-        assert embeddings[0] != embeddings[2]
+        assert not np.array_equal(embeddings[0], embeddings[1])
+        assert not np.array_equal(embeddings[1], embeddings[2])
+        assert not np.array_equal(embeddings[0], embeddings[2])
     
-    def test_embed_texts_deterministic(self):
+    def test_embed_texts_deterministic(self, fake_provider):
         """Test embed_texts produces deterministic results."""
-        provider = FakeEmbeddingsProvider()
-        
         texts = ["Text one", "Text two"]
-        embeddings1 = provider.embed_texts(texts)
-        embeddings2 = provider.embed_texts(texts)
+        embeddings1 = fake_provider.embed_texts(texts)
+        embeddings2 = fake_provider.embed_texts(texts)
         
-        assert embeddings1 == embeddings2
+        assert np.array_equal(embeddings1, embeddings2)
     
-    def test_embed_texts_consistent_with_embed_query(self):
+    def test_embed_texts_consistent_with_embed_query(self, fake_provider):
         """Test embed_texts produces same results as embed_query for same text."""
-        provider = FakeEmbeddingsProvider()
-        
         text = "consistency test"
-        query_embedding = provider.embed_query(text)
-        text_embeddings = provider.embed_texts([text])
+        query_embedding = fake_provider.embed_query(text)
+        text_embeddings = fake_provider.embed_texts([text])
         
-        assert query_embedding == text_embeddings[0]
+        assert np.array_equal(query_embedding, text_embeddings[0])
     
     def test_embed_texts_different_dimensions(self):
         """Test embed_texts works with different dimensions."""
@@ -126,45 +144,37 @@ class TestFakeEmbeddingsProvider:
         assert len(small_embedding) == 10
         assert len(large_embedding) == 1000
     
-    def test_empty_string_embedding(self):
+    def test_empty_string_embedding(self, fake_provider):
         """Test embedding empty string."""
-        provider = FakeEmbeddingsProvider()
-        
-        empty_embedding = provider.embed_query("")
+        empty_embedding = fake_provider.embed_query("")
         
         assert len(empty_embedding) == 384
-        assert all(isinstance(val, float) for val in empty_embedding)
+        assert empty_embedding.dtype == np.float32
         assert all(-1.0 <= val <= 1.0 for val in empty_embedding)
     
-    def test_unicode_text_embedding(self):
+    def test_unicode_text_embedding(self, fake_provider):
         """Test embedding text with unicode characters."""
-        provider = FakeEmbeddingsProvider()
-        
         unicode_text = "Hello 世界 🌍 café naïve"
-        embedding = provider.embed_query(unicode_text)
+        embedding = fake_provider.embed_query(unicode_text)
         
         assert len(embedding) == 384
-        assert all(isinstance(val, float) for val in embedding)
+        assert embedding.dtype == np.float32
     
-    def test_long_text_embedding(self):
+    def test_long_text_embedding(self, fake_provider):
         """Test embedding very long text."""
-        provider = FakeEmbeddingsProvider()
-        
         long_text = "This is a very long text. " * 1000  # ~27,000 characters
-        embedding = provider.embed_query(long_text)
+        embedding = fake_provider.embed_query(long_text)
         
         assert len(embedding) == 384
-        assert all(isinstance(val, float) for val in embedding)
+        assert embedding.dtype == np.float32
     
-    def test_special_characters_embedding(self):
+    def test_special_characters_embedding(self, fake_provider):
         """Test embedding text with special characters."""
-        provider = FakeEmbeddingsProvider()
-        
         special_text = "!@#$%^&*()_+-=[]{}|;':\",./<>?"
-        embedding = provider.embed_query(special_text)
+        embedding = fake_provider.embed_query(special_text)
         
         assert len(embedding) == 384
-        assert all(isinstance(val, float) for val in embedding)
+        assert embedding.dtype == np.float32
 
 
 class TestGeminiEmbeddingsProvider:
@@ -191,10 +201,9 @@ class TestEmbeddingsProviderInterface:
         with pytest.raises(TypeError):
             EmbeddingsProvider()
     
-    def test_fake_provider_implements_interface(self):
+    def test_fake_provider_implements_interface(self, fake_provider):
         """Test that FakeEmbeddingsProvider implements the interface."""
-        provider = FakeEmbeddingsProvider()
-        assert isinstance(provider, EmbeddingsProvider)
+        assert isinstance(fake_provider, EmbeddingsProvider)
     
     def test_interface_methods_exist(self):
         """Test that interface defines required methods."""
@@ -202,6 +211,150 @@ class TestEmbeddingsProviderInterface:
         assert hasattr(EmbeddingsProvider, 'embed_query')
 
 
+class TestCachedEmbeddingsProvider:
+    """Test cases for CachedEmbeddingsProvider."""
+    
+    def test_implements_interface(self, fake_provider):
+        """Test that CachedEmbeddingsProvider implements the interface."""
+        provider = CachedEmbeddingsProvider(fake_provider)
+        assert isinstance(provider, EmbeddingsProvider)
+    
+    def test_repeat_texts_served_from_cache(self):
+        """Test that only cache misses reach the underlying provider."""
+        underlying = CountingEmbeddingsProvider()
+        provider = CachedEmbeddingsProvider(underlying, namespace="fake")
+        
+        provider.embed_texts(["first", "second"])
+        provider.embed_texts(["second", "third"])
+        
+        assert underlying.embedded_texts == ["first", "second", "third"]
+    
+    def test_hits_match_misses(self):
+        """Test cached embeddings equal freshly computed ones."""
+        provider = CachedEmbeddingsProvider(CountingEmbeddingsProvider())
+        
+        miss = provider.embed_texts(["same text"])
+        hit = provider.embed_texts(["same text"])
+        
+        assert np.array_equal(miss, hit)
+        assert hit[0].dtype == np.float32
+    
+    def test_matches_underlying_values(self):
+        """Test cached values are the underlying embeddings at float32 precision."""
+        underlying = FakeEmbeddingsProvider(embedding_dim=16)
+        provider = CachedEmbeddingsProvider(underlying)
+        
+        expected = underlying.embed_query("precision")
+        actual = provider.embed_texts(["precision"])[0]
+        
+        assert actual == pytest.approx(expected, abs=1e-6)
+    
+    def test_namespace_separates_entries(self):
+        """Test different namespaces don't share cache entries."""
+        store = {}
+        underlying = CountingEmbeddingsProvider()
+        
+        CachedEmbeddingsProvider(underlying, store=store, namespace="model-a").embed_texts(["text"])
+        CachedEmbeddingsProvider(underlying, store=store, namespace="model-b").embed_texts(["text"])
+        
+        assert underlying.embedded_texts == ["text", "text"]
+        assert len(store) == 2
+    
+    def test_query_cache(self):
+        """Test embed_query is cached separately from documents."""
+        underlying = CountingEmbeddingsProvider()
+        provider = CachedEmbeddingsProvider(underlying)
+        
+        first = provider.embed_query("query")
+        second = provider.embed_query("query")
+        
+        assert np.array_equal(first, second)
+        assert underlying.embedded_queries == ["query"]
+    
+    def test_empty_list(self, fake_provider):
+        """Test embed_texts with empty list returns no embeddings."""
+        provider = CachedEmbeddingsProvider(fake_provider)
+        assert len(provider.embed_texts([])) == 0
+    
+    def test_quantized_store_is_smaller(self):
+        """Test int8 records hold a 2-byte scale plus one byte per dimension."""
+        store = {}
+        provider = CachedEmbeddingsProvider(FakeEmbeddingsProvider(embedding_dim=384), store=store, quantize=True)
+        
+        provider.embed_texts(["text"])
+        
+        assert [len(data) for data in store.values()] == [2 + 384]
+    
+    def test_quantized_hits_match_misses(self):
+        """Test quantized cache hits return the same dequantized values as misses."""
+        underlying = FakeEmbeddingsProvider(embedding_dim=64)
+        provider = CachedEmbeddingsProvider(underlying, quantize=True)
+        
+        miss = provider.embed_texts(["same text"])
+        hit = provider.embed_texts(["same text"])
+        
+        assert np.array_equal(miss, hit)
+        assert hit.dtype == np.float32
+        assert np.allclose(hit[0], underlying.embed_query("same text"), atol=0.01)
+    
+    def test_quantized_keys_separate_from_float32(self):
+        """Test quantized and float32 caches never read each other's records."""
+        store = {}
+        underlying = CountingEmbeddingsProvider()
+        
+        CachedEmbeddingsProvider(underlying, store=store).embed_texts(["text"])
+        CachedEmbeddingsProvider(underlying, store=store, quantize=True).embed_texts(["text"])
+        
+        assert underlying.embedded_texts == ["text", "text"]
+        assert len(store) == 2
+    
+    def test_embed_query_int8(self):
+        """Test embed_query_int8 matches quantizing the float query."""
+        underlying = FakeEmbeddingsProvider(embedding_dim=32)
+        expected_scale, expected_q = quantize_int8(underlying.embed_query("query"))
+        
+        for quantize in (False, True):
+            scale, q = CachedEmbeddingsProvider(underlying, quantize=quantize).embed_query_int8("query")
+            assert scale == expected_scale
+            assert np.array_equal(q, expected_q)
+
+
+class TestInt8Quantization:
+    """Test cases for the int8 embedding codec."""
+    
+    def test_round_trip_error_bounded_by_half_scale(self):
+        """Test dequantized values are within half a quantization step."""
+        embedding = FakeEmbeddingsProvider(embedding_dim=128).embed_query("round trip")
+        
+        scale, q = quantize_int8(embedding)
+        
+        assert q.dtype == np.int8
+        assert np.max(np.abs(dequantize_int8(scale, q) - embedding)) <= scale / 2 + 1e-6
+    
+    def test_zero_vector(self):
+        """Test an all-zero vector quantizes without dividing by zero."""
+        scale, q = quantize_int8(np.zeros(8, dtype=np.float32))
+        
+        assert not np.any(q)
+        assert not np.any(dequantize_int8(scale, q))
+    
+    def test_cosine_similarity_matches_float(self):
+        """Test int8 cosine similarity tracks float32 cosine similarity."""
+        provider = FakeEmbeddingsProvider(embedding_dim=256)
+        matrix = provider.embed_texts(["alpha", "beta", "gamma"])
+        query = provider.embed_query("alpha")
+        
+        expected = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+        actual = int8_cosine_similarity(
+            quantize_int8(query)[1],
+            np.stack([quantize_int8(row)[1] for row in matrix])
+        )
+        
+        assert actual.dtype == np.float32
+        assert np.allclose(actual, expected, atol=0.01)
+        assert int(np.argmax(actual)) == 0
+
+
 class TestGetEmbeddingsProvider:
     """Test cases for get_embeddings_provider factory function."""
     
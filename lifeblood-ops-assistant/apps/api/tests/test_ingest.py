@@ -0,0 +1,84 @@
+"""Tests for the ingest route's chunking helpers."""
+
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+from app.routes import ingest
+from app.utils.chunking import chunk_documents
+
+
+@pytest.fixture
+def documents():
+    """Mix of single-chunk and multi-chunk documents."""
+    return [
+        {
+            'doc_id': f'doc{i}',
+            'title': f'Doc {i}',
+            'text': f"Document {i} sentence about plasma handling. " * (10 if i % 2 else 200)
+        }
+        for i in range(6)
+    ]
+
+
+class RecordingVectorStore:
+    """Vector store stub recording the batches passed to aadd_documents."""
+    
+    def __init__(self, fail_on: str = None):
+        self.batches = []
+        self.fail_on = fail_on
+    
+    async def aadd_documents(self, documents):
+        texts = [doc.page_content for doc in documents]
+        if self.fail_on in texts:
+            raise RuntimeError(f"embedding failed for {self.fail_on}")
+        self.batches.append(texts)
+        return [f"id-{text}" for text in texts]
+
+
+class TestChunkDocumentsOffLoop:
+    """Test cases for _chunk_documents_off_loop."""
+    
+    def test_small_corpus_matches_chunk_documents(self, documents):
+        """Test the worker-thread path returns the same chunks as chunk_documents."""
+        chunks = asyncio.run(ingest._chunk_documents_off_loop(documents))
+        
+        assert chunks == chunk_documents(documents)
+    
+    def test_sharded_corpus_matches_chunk_documents(self, documents, monkeypatch):
+        """Test the process-pool path returns the same chunks, in document order."""
+        monkeypatch.setattr(ingest, "_PROCESS_POOL_MIN_CHARS", 0)
+        
+        try:
+            chunks = asyncio.run(ingest._chunk_documents_off_loop(documents))
+            assert ingest._chunking_pool is not None
+        finally:
+            ingest.shutdown_chunking_pool()
+        
+        assert chunks == chunk_documents(documents)
+        assert [chunk['chunk_id'] for chunk in chunks] == [
+            chunk['chunk_id'] for chunk in chunk_documents(documents)
+        ]
+
+
+class TestAddDocumentsInBatches:
+    """Test cases for _add_documents_in_batches."""
+    
+    def test_all_documents_added_in_batches(self):
+        """Test every document is added once, in batches of batch_size."""
+        vectorstore = RecordingVectorStore()
+        documents = [Document(page_content=f"chunk {i}") for i in range(5)]
+        
+        asyncio.run(ingest._add_documents_in_batches(vectorstore, documents, 2, 2))
+        
+        assert sorted(vectorstore.batches) == [
+            ["chunk 0", "chunk 1"], ["chunk 2", "chunk 3"], ["chunk 4"]
+        ]
+    
+    def test_batch_failure_raises_original_error(self):
+        """Test a failing batch surfaces its own exception, not an ExceptionGroup."""
+        vectorstore = RecordingVectorStore(fail_on="chunk 3")
+        documents = [Document(page_content=f"chunk {i}") for i in range(5)]
+        
+        with pytest.raises(RuntimeError, match="embedding failed for chunk 3"):
+            asyncio.run(ingest._add_documents_in_batches(vectorstore, documents, 2, 2))
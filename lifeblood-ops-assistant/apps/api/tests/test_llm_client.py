@@ -1,14 +1,40 @@
 """Tests for LLM client implementations."""
 
+import numpy as np
 import pytest
+from app.services.embeddings import FakeEmbeddingsProvider
 from app.services.llm_client import (
     LLMClient, 
     MockLLMClient, 
     GeminiLLMClient,
+    SemanticCachedLLMClient,
     get_llm_client
 )
 
 
+class CountingLLMClient(MockLLMClient):
+    """Mock client that records which prompts reach it."""
+    
+    def __init__(self):
+        super().__init__()
+        self.prompts = []
+    
+    def generate(self, prompt):
+        self.prompts.append(prompt)
+        return super().generate(prompt)
+
+
+class FixedEmbeddingsProvider(FakeEmbeddingsProvider):
+    """Provider returning preset query vectors, for controlling similarity."""
+    
+    def __init__(self, vectors):
+        super().__init__(embedding_dim=2)
+        self.vectors = vectors
+    
+    def embed_query(self, text):
+        return np.asarray(self.vectors[text], dtype=np.float32)
+
+
 class TestMockLLMClient:
     """Test cases for MockLLMClient."""
     
@@ -119,6 +145,26 @@ class TestMockLLMClient:
         assert "Testing topic:" in response
         assert "{topic}" not in response  # Template should be formatted
     
+    def test_generate_follows_template_changes(self):
+        """Test memoized responses don't outlive a change of templates."""
+        client = MockLLMClient(response_templates=["First: {topic}"])
+        client.generate("blood safety protocols")
+        
+        client.response_templates = ["Second: {topic}"]
+        
+        assert client.generate("blood safety protocols").startswith("Second:")
+    
+    def test_generate_stream_joins_to_generate(self):
+        """Test streamed pieces concatenate to the full response."""
+        client = MockLLMClient()
+        prompt = "What is donor eligibility?"
+        
+        pieces = list(client.generate_stream(prompt))
+        
+        assert len(pieces) > 1
+        assert all(len(piece) <= 8 for piece in pieces)
+        assert "".join(pieces) == client.generate(prompt)
+    
     def test_generate_long_prompt_adds_detail(self):
         """Test generate adds detail comment for long prompts."""
         client = MockLLMClient()
@@ -200,6 +246,63 @@ class TestGeminiLLMClient:
         assert callable(getattr(GeminiLLMClient, 'generate'))
 
 
+class TestSemanticCachedLLMClient:
+    """Test cases for SemanticCachedLLMClient."""
+    
+    def test_repeated_prompt_hits_cache(self):
+        """Test the same prompt is only generated once."""
+        llm = CountingLLMClient()
+        client = SemanticCachedLLMClient(llm, FakeEmbeddingsProvider())
+        
+        first = client.generate("What is the donor eligibility age?")
+        second = client.generate("What is the donor eligibility age?")
+        
+        assert first == second
+        assert llm.prompts == ["What is the donor eligibility age?"]
+    
+    def test_similar_prompt_above_threshold_hits(self):
+        """Test a near-duplicate prompt reuses the cached response."""
+        llm = CountingLLMClient()
+        embedder = FixedEmbeddingsProvider({"a": [1.0, 0.0], "a2": [0.99, 0.05], "b": [0.0, 1.0]})
+        client = SemanticCachedLLMClient(llm, embedder, threshold=0.95)
+        
+        response = client.generate("a")
+        
+        assert client.generate("a2") == response
+        client.generate("b")
+        assert llm.prompts == ["a", "b"]
+    
+    def test_oldest_entry_evicted(self):
+        """Test the cache keeps at most max_entries prompts."""
+        llm = CountingLLMClient()
+        client = SemanticCachedLLMClient(llm, FakeEmbeddingsProvider(), max_entries=2)
+        
+        for prompt in ["first", "second", "third", "first"]:
+            client.generate(prompt)
+        
+        assert llm.prompts == ["first", "second", "third", "first"]
+    
+    def test_generate_stream_uses_cache(self):
+        """Test the default generate_stream goes through the cache."""
+        llm = CountingLLMClient()
+        client = SemanticCachedLLMClient(llm, FakeEmbeddingsProvider())
+        
+        streamed = "".join(client.generate_stream("prompt"))
+        
+        assert streamed == client.generate("prompt")
+        assert llm.prompts == ["prompt"]
+    
+    def test_empty_prompt_not_cached(self):
+        """Test empty prompts go straight to the underlying client."""
+        llm = CountingLLMClient()
+        client = SemanticCachedLLMClient(llm, FakeEmbeddingsProvider())
+        
+        client.generate("   ")
+        client.generate("   ")
+        
+        assert llm.prompts == ["   ", "   "]
+
+
 class TestLLMClientInterface:
     """Test cases for LLMClient interface."""
     
@@ -216,6 +319,7 @@ class TestLLMClientInterface:
     def test_interface_methods_exist(self):
         """Test that interface defines required methods."""
         assert hasattr(LLMClient, 'generate')
+        assert hasattr(LLMClient, 'generate_stream')
 
 
 class TestGetLLMClient:
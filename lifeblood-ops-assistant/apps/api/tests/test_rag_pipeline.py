@@ -1,12 +1,18 @@
 """Tests for RAG pipeline implementation."""
 
+import asyncio
 import tempfile
 import shutil
 import os
 import pytest
+import numpy as np
 import time
 
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
 from app.services.rag_pipeline import RAGPipeline
+from app.services.semantic_cache import SemanticAnswerCache
 from app.services.embeddings import FakeEmbeddingsProvider
 from app.services.retrieval import ChromaVectorStore
 from app.services.llm_client import MockLLMClient
@@ -499,3 +505,499 @@ class TestRAGPipelineIntegration:
         # Should get fallback response
         assert "don't have enough information" in result["answer"].lower()
         assert result["citations"] == []
+
+
+class StubVectorStore:
+    """LangChain-style vector store returning fixed documents and counting searches."""
+    
+    def __init__(self):
+        self.searches = 0
+    
+    def similarity_search_with_relevance_scores(self, query, k):
+        self.searches += 1
+        return [(
+            Document(
+                page_content="Blood donors must be between 17-65 years old and weigh at least 110 pounds.",
+                metadata={'doc_id': 'donor_eligibility', 'title': 'Donor Eligibility', 'chunk_id': 'c0'}
+            ),
+            0.9
+        )][:k]
+    
+    async def asimilarity_search_with_relevance_scores(self, query, k):
+        return self.similarity_search_with_relevance_scores(query, k)
+    
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k):
+        # Chroma's by-vector search returns distances rather than relevance scores
+        return [(doc, 1.0 - score) for doc, score in self.similarity_search_with_relevance_scores(None, k)]
+    
+    def _select_relevance_score_fn(self):
+        return lambda distance: 1.0 - distance
+
+
+class EmptyVectorStore(StubVectorStore):
+    """Vector store stub that never finds anything."""
+    
+    def similarity_search_with_relevance_scores(self, query, k):
+        self.searches += 1
+        return []
+
+
+class StubCollection:
+    """Chroma-style collection recording each query call."""
+    
+    def __init__(self):
+        self.queries = []
+    
+    def query(self, query_embeddings, n_results, include):
+        self.queries.append((len(query_embeddings), n_results))
+        texts = [f"Donor guideline number {i} with enough text to cite." for i in range(n_results)]
+        rows = len(query_embeddings)
+        return {
+            'documents': [texts] * rows,
+            'metadatas': [[{'doc_id': f'doc{i}'} for i in range(n_results)]] * rows,
+            'ids': [[f'id{i}' for i in range(n_results)]] * rows,
+            'distances': [[0.1 * i for i in range(n_results)]] * rows,
+        }
+
+
+class ChromaLikeVectorStore(StubVectorStore):
+    """Vector store stub exposing a collection, as langchain_chroma.Chroma does."""
+    
+    def __init__(self):
+        super().__init__()
+        self._collection = StubCollection()
+
+
+class StubBatchEmbeddings:
+    """LangChain-style embeddings recording each embed_documents call."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def embed_documents(self, texts, task_type=None):
+        self.calls.append(list(texts))
+        return [[1.0, 0.0] for _ in texts]
+
+
+class KeywordEmbeddings:
+    """Embeddings stub placing questions that mention the same keyword together."""
+    
+    KEYWORDS = ("age", "weight", "iron")
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def embed_query(self, text):
+        self.calls += 1
+        return [1.0 if keyword in text.lower() else 0.0 for keyword in self.KEYWORDS]
+    
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+    
+    def embed_documents(self, texts, task_type=None):
+        return [self.embed_query(text) for text in texts]
+
+
+class StubChatModel:
+    """LangChain-style chat model returning a fixed answer."""
+    
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.prompts = []
+    
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        if self.fail:
+            raise RuntimeError("LLM unavailable")
+        
+        class Response:
+            text = "Donors must be 17-65 years old [1]."
+        return Response()
+    
+    async def ainvoke(self, prompt):
+        return self.invoke(prompt)
+    
+    async def astream(self, prompt):
+        
+        class Chunk:
+            def __init__(self, content):
+                self.content = content
+        
+        text = self.invoke(prompt).text
+        for start in range(0, len(text), 8):
+            yield Chunk(text[start:start + 8])
+    
+    def batch_as_completed(self, prompts, return_exceptions=False):
+        # Finish in reverse order, as if later prompts had shorter answers
+        results = self.batch(prompts, return_exceptions=return_exceptions)
+        return reversed(list(enumerate(results)))
+    
+    def batch(self, prompts, return_exceptions=False):
+        results = []
+        for prompt in prompts:
+            try:
+                results.append(self.invoke(prompt))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+
+class TestRAGPipelineAnswerCache:
+    """Test cases for the exact-match answer cache in RAGPipeline.ask."""
+    
+    def test_repeated_question_served_from_cache(self):
+        """Test a repeated question skips retrieval and generation."""
+        vectorstore, llm = StubVectorStore(), StubChatModel()
+        pipeline = RAGPipeline(vectorstore=vectorstore, embeddings=None, llm=llm)
+        
+        first = pipeline.ask("How old must donors be?")
+        second = pipeline.ask("  how old must DONORS be?  ")
+        
+        assert first == second
+        assert vectorstore.searches == 1
+        assert len(llm.prompts) == 1
+    
+    def test_mode_and_top_k_are_part_of_key(self):
+        """Test different modes or top_k values are answered separately."""
+        vectorstore = StubVectorStore()
+        pipeline = RAGPipeline(vectorstore=vectorstore, embeddings=None, llm=StubChatModel())
+        
+        pipeline.ask("How old must donors be?", mode="general")
+        pipeline.ask("How old must donors be?", mode="checklist")
+        pipeline.ask("How old must donors be?", mode="general", top_k=3)
+        
+        assert vectorstore.searches == 3
+    
+    def test_errors_not_cached(self):
+        """Test error fallbacks are recomputed on the next call."""
+        vectorstore = StubVectorStore()
+        pipeline = RAGPipeline(vectorstore=vectorstore, embeddings=None, llm=StubChatModel(fail=True))
+        
+        pipeline.ask("How old must donors be?")
+        pipeline.ask("How old must donors be?")
+        
+        assert vectorstore.searches == 2
+    
+    def test_lru_eviction_and_clear(self):
+        """Test the least recently used answer is evicted and clear empties the cache."""
+        vectorstore = StubVectorStore()
+        pipeline = RAGPipeline(vectorstore=vectorstore, embeddings=None, llm=StubChatModel(), answer_cache_size=2)
+        
+        for question in ["first?", "second?", "first?", "third?", "second?"]:
+            pipeline.ask(question)
+        assert vectorstore.searches == 4  # "second?" was evicted by "third?"
+        
+        pipeline.clear_answer_cache()
+        pipeline.ask("first?")
+        assert vectorstore.searches == 5
+    
+    def test_cache_disabled(self):
+        """Test answer_cache_size=0 disables caching."""
+        vectorstore = StubVectorStore()
+        pipeline = RAGPipeline(vectorstore=vectorstore, embeddings=None, llm=StubChatModel(), answer_cache_size=0)
+        
+        pipeline.ask("How old must donors be?")
+        pipeline.ask("How old must donors be?")
+        
+        assert vectorstore.searches == 2
+    
+    def test_no_information_fallback_cached(self):
+        """Test a question with no meaningful sources is not retrieved again."""
+        vectorstore = EmptyVectorStore()
+        llm = StubChatModel()
+        pipeline = RAGPipeline(vectorstore=vectorstore, embeddings=None, llm=llm)
+        
+        first = pipeline.ask("What is the moon made of?")
+        second = pipeline.ask("What is the moon made of?")
+        
+        assert first == second
+        assert "don't have enough information" in first["answer"]
+        assert vectorstore.searches == 1
+        assert llm.prompts == []
+    
+    def test_cache_keyed_by_question_digest(self):
+        """Test long questions are cached under a fixed-size digest."""
+        pipeline = RAGPipeline(vectorstore=StubVectorStore(), embeddings=None, llm=StubChatModel())
+        long_question = "How old must donors be? " * 1000
+        
+        pipeline.ask(long_question)
+        
+        (digest, mode, top_k), = pipeline._answer_cache.keys()
+        assert len(digest) == 16
+        assert (mode, top_k) == ("general", 5)
+
+
+class TestRAGPipelineAskBatch:
+    """Test cases for answering several questions with RAGPipeline.ask_batch."""
+    
+    def test_batch_matches_individual_answers(self):
+        """Test batched results equal ask() results and share one embeddings call."""
+        embeddings = StubBatchEmbeddings()
+        llm = StubChatModel()
+        pipeline = RAGPipeline(vectorstore=StubVectorStore(), embeddings=embeddings, llm=llm, answer_cache_size=0)
+        requests = [("How old must donors be?", "general", 5), ("What is the weight limit?", "checklist", 3)]
+        
+        results = pipeline.ask_batch(requests)
+        
+        assert embeddings.calls == [["How old must donors be?", "What is the weight limit?"]]
+        expected = [pipeline.ask(question, mode, top_k) for question, mode, top_k in requests]
+        assert results == expected
+        assert llm.prompts[:2] == llm.prompts[2:]
+    
+    def test_batch_with_standard_langchain_embeddings(self):
+        """Test embeddings without a task_type argument are embedded per question."""
+        pipeline = RAGPipeline(
+            vectorstore=StubVectorStore(), embeddings=DeterministicFakeEmbedding(size=8), llm=StubChatModel()
+        )
+        requests = [("How old must donors be?", "general", 5), ("What is the weight limit?", "checklist", 3)]
+        
+        results = pipeline.ask_batch(requests)
+        
+        assert all(result["citations"] for result in results)
+        assert results == [pipeline.ask(question, mode, top_k) for question, mode, top_k in requests]
+    
+    def test_batch_uses_and_fills_answer_cache(self):
+        """Test cached questions skip the batch and new answers are cached."""
+        embeddings = StubBatchEmbeddings()
+        vectorstore = StubVectorStore()
+        pipeline = RAGPipeline(vectorstore=vectorstore, embeddings=embeddings, llm=StubChatModel())
+        pipeline.ask("How old must donors be?")
+        
+        results = pipeline.ask_batch([("How old must donors be?", "general", 5), ("New question?", "general", 5)])
+        
+        assert embeddings.calls == [["New question?"]]
+        assert results[1] == pipeline.ask("New question?")
+        assert vectorstore.searches == 2  # the final ask() was a cache hit
+    
+    def test_batch_queries_collection_once(self):
+        """Test a Chroma-like store is queried once and each row is cut to its own top_k."""
+        vectorstore = ChromaLikeVectorStore()
+        pipeline = RAGPipeline(vectorstore=vectorstore, embeddings=StubBatchEmbeddings(), llm=StubChatModel())
+        
+        results = pipeline.ask_batch([("First question?", "general", 2), ("Second question?", "general", 4)])
+        
+        assert vectorstore._collection.queries == [(2, 4)]
+        assert [len(r["citations"]) for r in results] == [2, 4]
+        assert results[1]["citations"][1]["score"] == pytest.approx(0.9)
+    
+    def test_batch_reports_results_as_completed(self):
+        """Test on_result receives each answer as it finishes, with its request index."""
+        pipeline = RAGPipeline(vectorstore=StubVectorStore(), embeddings=StubBatchEmbeddings(), llm=StubChatModel())
+        pipeline.ask("Cached question?")
+        reported = []
+        
+        results = pipeline.ask_batch(
+            [("First question?", "general", 5), ("Cached question?", "general", 5), ("Third question?", "general", 5)],
+            on_result=lambda i, result: reported.append((i, result))
+        )
+        
+        assert [i for i, _ in reported] == [1, 2, 0]
+        assert [result for _, result in sorted(reported, key=lambda item: item[0])] == results
+    
+    def test_batch_errors_are_per_question(self):
+        """Test empty questions and LLM failures produce the same fallbacks as ask()."""
+        pipeline = RAGPipeline(
+            vectorstore=StubVectorStore(), embeddings=StubBatchEmbeddings(), llm=StubChatModel(fail=True)
+        )
+        
+        results = pipeline.ask_batch([("   ", "general", 5), ("How old must donors be?", "general", 5)])
+        
+        assert results[0] == pipeline.ask("   ")
+        assert results[1] == pipeline.ask("How old must donors be?")
+        assert "error" in results[1]["answer"].lower()
+
+
+class TestRAGPipelineAskAsync:
+    """Test cases for the async RAGPipeline.ask_async path."""
+    
+    def test_matches_sync_ask(self):
+        """Test ask_async gives the same result and prompt as ask()."""
+        sync_llm, async_llm = StubChatModel(), StubChatModel()
+        sync_pipeline = RAGPipeline(vectorstore=StubVectorStore(), embeddings=None, llm=sync_llm)
+        async_pipeline = RAGPipeline(vectorstore=StubVectorStore(), embeddings=None, llm=async_llm)
+        
+        result = asyncio.run(async_pipeline.ask_async("How old must donors be?", "checklist", 3))
+        
+        assert result == sync_pipeline.ask("How old must donors be?", "checklist", 3)
+        assert async_llm.prompts == sync_llm.prompts
+    
+    def test_shares_answer_cache_and_fallbacks(self):
+        """Test ask_async uses the answer cache and returns ask()'s error fallbacks."""
+        vectorstore = StubVectorStore()
+        pipeline = RAGPipeline(vectorstore=vectorstore, embeddings=None, llm=StubChatModel())
+        pipeline.ask("How old must donors be?")
+        
+        asyncio.run(pipeline.ask_async("How old must donors be?"))
+        assert vectorstore.searches == 1
+        
+        failing = RAGPipeline(vectorstore=StubVectorStore(), embeddings=None, llm=StubChatModel(fail=True))
+        assert asyncio.run(failing.ask_async("How old?")) == failing.ask("How old?")
+        assert asyncio.run(failing.ask_async("  ")) == failing.ask("  ")
+
+
+class TestRAGPipelineAskStream:
+    """Test cases for streaming answers with RAGPipeline.ask_stream."""
+    
+    @staticmethod
+    def _collect(pipeline, question):
+        async def collect():
+            return [event async for event in pipeline.ask_stream(question)]
+        return asyncio.run(collect())
+    
+    def test_citations_first_then_answer_deltas(self):
+        """Test citations are sent before the answer and the deltas join to ask()'s answer."""
+        pipeline = RAGPipeline(vectorstore=StubVectorStore(), embeddings=None, llm=StubChatModel())
+        expected = RAGPipeline(vectorstore=StubVectorStore(), embeddings=None, llm=StubChatModel()).ask("How old?")
+        
+        events = self._collect(pipeline, "How old?")
+        
+        assert events[0] == {"citations": expected["citations"]}
+        assert len(events) > 2
+        assert "".join(event["delta"] for event in events[1:]) == expected["answer"]
+    
+    def test_streamed_answer_is_cached(self):
+        """Test a completed stream fills the answer cache used by ask()."""
+        vectorstore = StubVectorStore()
+        llm = StubChatModel()
+        pipeline = RAGPipeline(vectorstore=vectorstore, embeddings=None, llm=llm)
+        
+        events = self._collect(pipeline, "How old?")
+        
+        assert pipeline.ask("How old?")["answer"] == "".join(event["delta"] for event in events[1:])
+        assert self._collect(pipeline, "How old?")[1:] == [{"delta": "Donors must be 17-65 years old [1]."}]
+        assert vectorstore.searches == 1
+        assert len(llm.prompts) == 1
+    
+    def test_fallbacks_sent_as_single_delta(self):
+        """Test fallbacks and generation errors are streamed as one delta and not cached."""
+        empty = RAGPipeline(vectorstore=EmptyVectorStore(), embeddings=None, llm=StubChatModel())
+        assert self._collect(empty, "How old?") == [{"citations": []}, {"delta": empty.ask("How old?")["answer"]}]
+        
+        failing = RAGPipeline(vectorstore=StubVectorStore(), embeddings=None, llm=StubChatModel(fail=True))
+        events = self._collect(failing, "How old?")
+        assert events[-1] == {"delta": failing.ask("How old?")["answer"]}
+        assert len(failing.llm.prompts) == 2
+
+
+class TestRAGPipelineSemanticCache:
+    """Test cases for answering near-duplicate questions from the semantic cache."""
+    
+    def _pipeline(self):
+        vectorstore = StubVectorStore()
+        llm = StubChatModel()
+        pipeline = RAGPipeline(
+            vectorstore=vectorstore, embeddings=KeywordEmbeddings(), llm=llm,
+            answer_cache_size=0, semantic_cache=SemanticAnswerCache(threshold=0.95)
+        )
+        return pipeline, vectorstore, llm
+    
+    def test_near_duplicate_skips_retrieval_and_generation(self):
+        """Test a similar question reuses the answer while a different one does not."""
+        pipeline, vectorstore, llm = self._pipeline()
+        
+        first = pipeline.ask("What is the minimum donor age?")
+        second = pipeline.ask("Donor age requirements?")
+        pipeline.ask("What iron level is needed?")
+        
+        assert second == first
+        assert len(llm.prompts) == 2
+        assert vectorstore.searches == 2
+    
+    def test_shared_by_async_and_batch_paths(self):
+        """Test answers cached by ask() are served by ask_async and ask_batch."""
+        pipeline, _, llm = self._pipeline()
+        answer = pipeline.ask("What is the minimum donor age?")
+        
+        assert asyncio.run(pipeline.ask_async("Donor age?")) == answer
+        results = pipeline.ask_batch([("Age limits for donors?", "general", 5), ("Weight limits?", "general", 5)])
+        
+        assert results[0] == answer
+        assert len(llm.prompts) == 2  # only "Weight limits?" was generated
+    
+    def test_clear_answer_cache_clears_semantic_cache(self):
+        """Test clearing the answer cache also drops semantic entries."""
+        pipeline, _, llm = self._pipeline()
+        pipeline.ask("What is the minimum donor age?")
+        pipeline.clear_answer_cache()
+        pipeline.ask("Donor age?")
+        
+        assert len(llm.prompts) == 2
+    
+    def test_repeated_question_embedded_once(self):
+        """Test question embeddings are reused across paths and kept when answers are cleared."""
+        pipeline, _, llm = self._pipeline()
+        embeddings = pipeline.embeddings
+        pipeline.ask("What is the minimum donor age?")
+        pipeline.clear_answer_cache()
+        
+        pipeline.ask("  what is the minimum DONOR age?")
+        asyncio.run(pipeline.ask_async("What is the minimum donor age?"))
+        pipeline.ask_batch([("What is the minimum donor age?", "general", 5)])
+        
+        assert embeddings.calls == 1
+        assert len(llm.prompts) == 2
+
+
+class TestCreateSnippet:
+    """Test cases for RAGPipeline._create_snippet boundary handling."""
+    
+    def setup_method(self):
+        self.pipeline = RAGPipeline(vectorstore=None, embeddings=None, llm=None)
+    
+    def test_surrounding_whitespace_stripped(self):
+        """Test whitespace is stripped before measuring, even when it is long."""
+        assert self.pipeline._create_snippet("   short text.  \n") == "short text."
+        assert self.pipeline._create_snippet(" " * 500 + "short text." + " " * 500) == "short text."
+        assert self.pipeline._create_snippet("a" * 20 + " " * 300, max_length=20) == "a" * 20
+    
+    def test_cut_points(self):
+        """Test the sentence, word and hard cut rules on long text."""
+        sentence = "x" * 80 + ". " + "y" * 200
+        assert self.pipeline._create_snippet("  " + sentence, max_length=100) == "x" * 80 + "."
+        
+        words = "word " * 100
+        assert self.pipeline._create_snippet(words, max_length=100) == ("word " * 20).rstrip() + "..."
+        
+        assert self.pipeline._create_snippet("z" * 300, max_length=100) == "z" * 97 + "..."
+
+
+class TestPrepareCitations:
+    """Test cases for filtering retrieved documents into citations."""
+    
+    def test_low_score_and_short_snippets_filtered(self):
+        """Test documents below min_score or with short snippets are dropped and sources renumbered."""
+        pipeline = RAGPipeline(vectorstore=None, embeddings=None, llm=None)
+        long_text = "Donors must wait 56 days between whole blood donations."
+        docs_with_scores = [
+            (Document(page_content=long_text, metadata={'doc_id': 'low'}), 0.001),
+            (Document(page_content="   too short   ", metadata={'doc_id': 'short'}), 0.9),
+            (Document(page_content=long_text, metadata={'doc_id': 'kept', 'title': 'Intervals'}), 0.8),
+        ]
+        
+        citations, sources_text = pipeline._prepare_citations(docs_with_scores)
+        
+        assert [c['doc_id'] for c in citations] == ['kept']
+        assert "[1]" in sources_text and "[2]" not in sources_text
+    
+    def test_citation_fields_are_plain_types(self):
+        """Test citation scores are plain floats and snippets are stripped."""
+        pipeline = RAGPipeline(vectorstore=None, embeddings=None, llm=None)
+        doc = Document(page_content="  Donors must wait 56 days between donations.  ", metadata={'doc_id': 'd'})
+        
+        citations, _ = pipeline._prepare_citations([(doc, np.float32(0.75))])
+        
+        assert type(citations[0]['score']) is float
+        assert citations[0]['snippet'] == "Donors must wait 56 days between donations."
+    
+    def test_precomputed_snippet_used(self):
+        """Test a snippet stored in metadata at ingest is used instead of the page content."""
+        pipeline = RAGPipeline(vectorstore=None, embeddings=None, llm=None)
+        snippet = "Donors must wait 56 days between donations."
+        doc = Document(page_content="x" * 500, metadata={'doc_id': 'd', 'snippet': snippet})
+        
+        citations, sources_text = pipeline._prepare_citations([(doc, 0.75)])
+        
+        assert citations[0]['snippet'] == snippet
+        assert "x" * 50 not in sources_text
@@ -250,6 +250,40 @@ class TestChromaVectorStore:
         
         with pytest.raises(ValueError, match="Chunk missing required 'chunk_id' field"):
             self.store.upsert_chunks(invalid_chunk, embedding)
+
+    def test_upsert_splits_into_sub_batches(self, monkeypatch):
+        """Test large upserts are written in sub-batches without losing chunks."""
+        monkeypatch.setattr("app.services.retrieval._UPSERT_BATCH_SIZE", 2)
+        chunks = [
+            {
+                'doc_id': 'doc1',
+                'chunk_id': f'doc1_chunk_{i}',
+                'title': None if i % 2 else 'Batched Document',
+                'text': f'Batched chunk number {i}.',
+                'start': i * 30,
+                'end': i * 30 + 25
+            }
+            for i in range(5)
+        ]
+        embeddings = self.embeddings_provider.embed_texts([chunk['text'] for chunk in chunks])
+
+        self.store.upsert_chunks(chunks, embeddings)
+
+        assert self.store.count() == 5
+        stored = self.store.collection.get(ids=['doc1_chunk_1'], include=['metadatas'])
+        assert 'title' not in stored['metadatas'][0]
+
+    def test_upsert_dimension_mismatch_resets_collection(self):
+        """Test upserting embeddings of a new dimension recreates the collection."""
+        old_chunk = {'doc_id': 'old', 'chunk_id': 'old_chunk_0', 'text': 'Old embedding model text.'}
+        self.store.upsert_chunks([old_chunk], [self.embeddings_provider.embed_query(old_chunk['text'])])
+        
+        new_chunk = {'doc_id': 'new', 'chunk_id': 'new_chunk_0', 'text': 'New embedding model text.'}
+        new_embedding = FakeEmbeddingsProvider(embedding_dim=128).embed_query(new_chunk['text'])
+        self.store.upsert_chunks([new_chunk], [new_embedding])
+        
+        assert self.store.count() == 1
+        assert self.store.query(new_embedding, top_k=1)[0]['chunk_id'] == 'new_chunk_0'
     
     def test_empty_inputs(self):
         """Test handling of empty inputs."""
@@ -0,0 +1,54 @@
+"""Tests for the semantic answer cache."""
+
+import time
+
+from app.services.semantic_cache import SemanticAnswerCache
+
+
+class TestSemanticAnswerCache:
+    """Test cases for SemanticAnswerCache."""
+    
+    def test_similar_vector_hits_and_dissimilar_misses(self):
+        """Test lookups match by cosine similarity above the threshold."""
+        cache = SemanticAnswerCache(threshold=0.95)
+        cache.store([1.0, 0.0, 0.0], ("general", 5), "answer")
+        
+        assert cache.lookup([2.0, 0.1, 0.0], ("general", 5)) == "answer"  # scale doesn't matter
+        assert cache.lookup([0.0, 1.0, 0.0], ("general", 5)) is None
+    
+    def test_key_must_match(self):
+        """Test answers for another mode or top_k are never returned."""
+        cache = SemanticAnswerCache()
+        cache.store([1.0, 0.0], ("general", 5), "general answer")
+        cache.store([1.0, 0.0], ("checklist", 5), "checklist answer")
+        
+        assert cache.lookup([1.0, 0.0], ("checklist", 5)) == "checklist answer"
+        assert cache.lookup([1.0, 0.0], ("general", 3)) is None
+    
+    def test_oldest_entry_evicted(self):
+        """Test the ring evicts the oldest answer when full."""
+        cache = SemanticAnswerCache(max_entries=2)
+        for i, vector in enumerate([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]):
+            cache.store(vector, "key", i)
+        
+        assert cache.lookup([1.0, 0.0, 0.0], "key") is None
+        assert cache.lookup([0.0, 1.0, 0.0], "key") == 1
+        assert cache.lookup([0.0, 0.0, 1.0], "key") == 2
+    
+    def test_expired_entries_ignored(self):
+        """Test entries past their TTL miss."""
+        cache = SemanticAnswerCache(ttl_seconds=0.01)
+        cache.store([1.0, 0.0], "key", "answer")
+        time.sleep(0.05)
+        
+        assert cache.lookup([1.0, 0.0], "key") is None
+    
+    def test_zero_vector_and_clear(self):
+        """Test zero vectors are ignored and clear empties the cache."""
+        cache = SemanticAnswerCache()
+        cache.store([0.0, 0.0], "key", "ignored")
+        assert cache.lookup([0.0, 0.0], "key") is None
+        
+        cache.store([1.0, 0.0], "key", "answer")
+        cache.clear()
+        assert cache.lookup([1.0, 0.0], "key") is None